@@ -4,104 +4,1761 @@
 """
 
 import time
-import yaml
+
+# Reference point for the time-to-first-packet measurement
+PROCESS_STARTED = time.monotonic()
+
+import heapq
+import bisect
+import math
+import array
 import socket
 import threading
+import queue
 import signal
 import sys
+import os
 import random
+import re
+import zlib
+import json
+import marshal
+import hashlib
+import functools
+import atexit
+import socketserver
+import importlib
+from collections import OrderedDict
 from datetime import datetime
 
 
+class LazyModule:
+    """Stands in for a module and imports it when an attribute is first used.
+
+    importlib.import_module holds the import lock, so beacon threads touching
+    the module for the first time at once all get the fully loaded module.
+    """
+
+    def __init__(self, name):
+        self.__name = name
+
+    def __getattr__(self, attr):
+        module = importlib.import_module(self.__name)
+        self.__dict__.update(vars(module))
+        return getattr(module, attr)
+
+
+# Only some engines and features need these; a snapshot-loaded dry run never touches yaml
+asyncio = LazyModule('asyncio')
+yaml = LazyModule('yaml')
+csv = LazyModule('csv')
+sqlite3 = LazyModule('sqlite3')
+multiprocessing = LazyModule('multiprocessing')
+
+# numpy is optional and slow to import, so it is only loaded for batches big enough to gain from it
+numpy = None
+NUMPY_MIN_BATCH = 256
+
+# aprslib is only needed once a server sends us packets, so it is imported on first use
+aprslib = None
+
+# Upper bound on packets coalesced into a single socket write
+MAX_BATCH = 500
+
+# Packets per second replayed from the outbox when no rate_limit is set
+OUTBOX_REPLAY_RATE = 5.0
+
+# Bounded LRU indexes used by the stream reader
+ECHO_INDEX_SIZE = 10000
+CONFLICT_INDEX_SIZE = 1000
+
+
+def format_coordinate(coord, is_longitude=False):
+    degrees = int(abs(coord))
+    minutes = (abs(coord) - degrees) * 60
+    if is_longitude:
+        direction = 'E' if coord >= 0 else 'W'
+        return f"{degrees:03d}{minutes:05.2f}{direction}"
+    else:
+        direction = 'N' if coord >= 0 else 'S'
+        return f"{degrees:02d}{minutes:05.2f}{direction}"
+
+
+_MINUTE_STRINGS = []
+_DEGREE_STRINGS = {}
+
+
+def load_numpy():
+    global numpy
+    if numpy is None:
+        try:
+            import numpy as module
+        except ImportError:
+            module = False
+        numpy = module
+    return numpy or None
+
+
+def _format_axis_numpy(values, is_longitude):
+    """Vectorized format_coordinate for one axis, byte-identical to the scalar version.
+
+    Rounding to hundredths of a minute is done on integers; values whose scaled
+    minutes sit too close to a .5 boundary to trust the float product are
+    formatted the scalar way, so cases like 59.995 minutes round exactly as
+    f"{minutes:05.2f}" does.
+    """
+    if not _MINUTE_STRINGS:
+        _MINUTE_STRINGS.extend(f"{h // 100:02d}.{h % 100:02d}" for h in range(6001))
+    width = 3 if is_longitude else 2
+    if width not in _DEGREE_STRINGS:
+        _DEGREE_STRINGS[width] = [f"{d:0{width}d}" for d in range(181)]
+    degree_strings = _DEGREE_STRINGS[width]
+    positive, negative = ('E', 'W') if is_longitude else ('N', 'S')
+
+    values = numpy.asarray(values, dtype=float)
+    absolute = numpy.abs(values)
+    degrees = numpy.trunc(absolute)
+    minutes = (absolute - degrees) * 60
+    scaled = minutes * 100
+    hundredths = numpy.floor(scaled + 0.5).astype(numpy.int64)
+    ambiguous = numpy.nonzero(numpy.abs(scaled - numpy.floor(scaled) - 0.5) < 1e-6)[0]
+    for i in ambiguous:
+        hundredths[i] = int(f"{minutes[i]:.2f}".replace('.', ''))
+
+    result = []
+    for degree, hundredth, is_positive in zip(degrees.astype(numpy.int64).tolist(), hundredths.tolist(),
+                                              (values >= 0).tolist()):
+        degree_str = degree_strings[degree] if degree <= 180 else f"{degree:0{width}d}"
+        result.append(degree_str + _MINUTE_STRINGS[hundredth] + (positive if is_positive else negative))
+    return result
+
+
+def encode_coordinates(latitudes, longitudes):
+    """Batch format_coordinate: return (latitude strings, longitude strings).
+
+    Uses NumPy when it is installed and falls back to the scalar formatter.
+    """
+    if len(latitudes) >= NUMPY_MIN_BATCH and load_numpy() is not None:
+        return _format_axis_numpy(latitudes, False), _format_axis_numpy(longitudes, True)
+    return ([format_coordinate(lat, False) for lat in latitudes],
+            [format_coordinate(lon, True) for lon in longitudes])
+
+
+def _base91(value):
+    chars = []
+    for _ in range(4):
+        value, digit = divmod(value, 91)
+        chars.append(chr(33 + digit))
+    return "".join(reversed(chars))
+
+
+def compress_position(lat, lon):
+    """Base-91 YYYYXXXX part of an APRS compressed position."""
+    return _base91(int(380926 * (90 - lat))) + _base91(int(190463 * (180 + lon)))
+
+
+def encode_compressed(latitudes, longitudes):
+    """Batch compress_position, vectorized with NumPy when available."""
+    if len(latitudes) < NUMPY_MIN_BATCH or load_numpy() is None:
+        return [compress_position(lat, lon) for lat, lon in zip(latitudes, longitudes)]
+
+    y = numpy.trunc(380926 * (90 - numpy.asarray(latitudes, dtype=float))).astype(numpy.int64)
+    x = numpy.trunc(190463 * (180 + numpy.asarray(longitudes, dtype=float))).astype(numpy.int64)
+    columns = []
+    for value in (y, x):
+        for power in (91 ** 3, 91 ** 2, 91, 1):
+            columns.append(((value // power) % 91 + 33).tolist())
+    return ["".join(map(chr, digits)) for digits in zip(*columns)]
+
+
+class BeaconJob:
+    """One schedulable beacon; slotted so large object sets don't cost a dict each."""
+
+    __slots__ = ('key', 'kind', 'interval', 'args')
+
+    def __init__(self, key, kind, interval, args):
+        self.key = key
+        self.kind = kind
+        self.interval = interval
+        self.args = args
+
+    def __eq__(self, other):
+        if not isinstance(other, BeaconJob):
+            return NotImplemented
+        return (self.key, self.kind, self.interval, self.args) == \
+            (other.key, other.kind, other.interval, other.args)
+
+
+def read_csv_objects(source):
+    """Stream object records from a CSV file with a header row."""
+    with open(source['path'], newline='', encoding='utf-8') as f:
+        yield from csv.DictReader(f, delimiter=source.get('delimiter', ','))
+
+
+def iter_json_array(f, key, chunk_size=65536):
+    """Incrementally decode the items of the top-level array `key` in a JSON file.
+
+    The top-level object is walked key by key and other values are skipped
+    whole, so a nested object with its own `key` (say "metadata": {"features": []})
+    cannot be mistaken for the array we want.
+    """
+    decoder = json.JSONDecoder()
+    buf = f.read(chunk_size)
+    pos = 0
+
+    def more():
+        nonlocal buf, pos
+        chunk = f.read(chunk_size)
+        if not chunk:
+            return False
+        buf = buf[pos:] + chunk
+        pos = 0
+        return True
+
+    state = 'open'
+    name = None
+    while True:
+        while pos < len(buf) and buf[pos] in ' \t\r\n':
+            pos += 1
+        if pos >= len(buf):
+            if not more():
+                return
+            continue
+        char = buf[pos]
+        if state == 'open':
+            if char != '{':
+                return
+            pos += 1
+            state = 'key'
+        elif state == 'key':
+            if char == ',':
+                pos += 1
+            elif char == '}':
+                return
+            else:
+                try:
+                    name, end = decoder.raw_decode(buf, pos)
+                except ValueError:
+                    if not more():
+                        raise
+                    continue
+                pos = end
+                state = 'colon'
+        elif state == 'colon':
+            if char != ':':
+                raise ValueError(f"expected ':' after {name!r}")
+            pos += 1
+            state = 'value'
+        elif name == key:
+            if char != '[':
+                return
+            pos += 1
+            break
+        else:
+            try:
+                _, end = decoder.raw_decode(buf, pos)
+            except ValueError:
+                if not more():
+                    raise
+                continue
+            # A number cut off at the end of the buffer decodes "successfully"; decode it again whole
+            if end == len(buf) and more():
+                continue
+            pos = end
+            state = 'key'
+
+    while True:
+        while pos < len(buf) and buf[pos] in ' \t\r\n,':
+            pos += 1
+        if pos < len(buf) and buf[pos] == ']':
+            return
+        try:
+            item, end = decoder.raw_decode(buf, pos)
+        except ValueError:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                raise
+            buf = buf[pos:] + chunk
+            pos = 0
+            continue
+        yield item
+        buf = buf[end:]
+        pos = 0
+
+
+def record_coordinate(record, key, limit):
+    """A latitude/longitude from an object record (YAML, CSV text, SQLite, ...), range-checked."""
+    try:
+        value = float(record.get(key))
+    except (TypeError, ValueError):
+        raise ValueError(f"{key} must be a number, got {record.get(key)!r}") from None
+    if not -limit <= value <= limit:
+        raise ValueError(f"{key} must be between -{limit} and {limit}, got {value}")
+    return value
+
+
+def read_geojson_objects(source):
+    """Stream object records from the Point features of a GeoJSON FeatureCollection."""
+    with open(source['path'], encoding='utf-8') as f:
+        for feature in iter_json_array(f, 'features'):
+            geometry = feature.get('geometry') or {}
+            if geometry.get('type') != 'Point':
+                continue
+            record = dict(feature.get('properties') or {})
+            record['longitude'], record['latitude'] = geometry['coordinates'][:2]
+            yield record
+
+
+def read_sqlite_objects(source):
+    """Stream object records from a SQLite table whose columns match the YAML keys."""
+    table = source.get('table', 'objects')
+    if not re.fullmatch(r'[A-Za-z_][A-Za-z0-9_]*', table):
+        raise ValueError(f"invalid table name: {table!r}")
+    conn = sqlite3.connect(source['path'])
+    try:
+        cursor = conn.execute(f"SELECT * FROM {table}")
+        columns = [column[0] for column in cursor.description]
+        for row in cursor:
+            yield dict(zip(columns, row))
+    finally:
+        conn.close()
+
+
+OBJECT_SOURCES = {
+    'csv': read_csv_objects,
+    'geojson': read_geojson_objects,
+    'sqlite': read_sqlite_objects,
+}
+
+
+class Track:
+    """A recorded track held as compact parallel arrays, indexed by time for playback.
+
+    Times are seconds from the first point; positions between points are
+    interpolated linearly.
+    """
+
+    __slots__ = ('times', 'lats', 'lons')
+
+    def __init__(self, points):
+        points = sorted(points)
+        if len(points) < 2:
+            raise ValueError("a track needs at least two timed points")
+        start = points[0][0]
+        self.times = array.array('d', (t - start for t, _, _ in points))
+        self.lats = array.array('d', (lat for _, lat, _ in points))
+        self.lons = array.array('d', (lon for _, _, lon in points))
+        if self.times[-1] <= 0:
+            raise ValueError("a track's points must not all share one timestamp")
+
+    @property
+    def duration(self):
+        return self.times[-1]
+
+    def segment(self, t):
+        """Index of the segment (point i to i + 1) covering track time `t`."""
+        return min(max(bisect.bisect_right(self.times, t) - 1, 0), len(self.times) - 2)
+
+    def position(self, t):
+        i = self.segment(t)
+        t0, t1 = self.times[i], self.times[i + 1]
+        f = min(max((t - t0) / (t1 - t0), 0.0), 1.0) if t1 > t0 else 0.0
+        return (self.lats[i] + (self.lats[i + 1] - self.lats[i]) * f,
+                self.lons[i] + (self.lons[i + 1] - self.lons[i]) * f)
+
+    def velocity(self, i):
+        """(course in degrees, speed in km/h) along segment i."""
+        lat0, lon0, lat1, lon1 = self.lats[i], self.lons[i], self.lats[i + 1], self.lons[i + 1]
+        north = math.radians(lat1 - lat0)
+        east = math.radians(lon1 - lon0) * math.cos(math.radians((lat0 + lat1) / 2))
+        course = math.degrees(math.atan2(east, north)) % 360
+        seconds = self.times[i + 1] - self.times[i]
+        speed = math.hypot(north, east) * 6371.0 / seconds * 3600 if seconds > 0 else 0.0
+        return course, speed
+
+
+def parse_track_time(value):
+    """Seconds since the epoch from a number or an ISO 8601 timestamp."""
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value.strip().replace('Z', '+00:00')).timestamp()
+
+
+def read_gpx_track(path):
+    points = []
+    from xml.etree import ElementTree
+    for _, element in ElementTree.iterparse(path):
+        if element.tag.rsplit('}', 1)[-1] != 'trkpt':
+            continue
+        when = next((child.text for child in element if child.tag.rsplit('}', 1)[-1] == 'time'), None)
+        if when:
+            points.append((parse_track_time(when), float(element.get('lat')), float(element.get('lon'))))
+        element.clear()
+    return Track(points)
+
+
+def read_csv_track(path):
+    """CSV with a header row naming time, latitude and longitude columns."""
+    with open(path, newline='', encoding='utf-8') as f:
+        return Track([(parse_track_time(row['time']), float(row['latitude']), float(row['longitude']))
+                      for row in csv.DictReader(f)])
+
+
+TRACK_READERS = {
+    'gpx': read_gpx_track,
+    'csv': read_csv_track,
+}
+
+# slow_speed/fast_speed in km/h, rates and turn_time in seconds, turn_min in degrees
+SMART_BEACONING_DEFAULTS = (
+    ('slow_speed', 5.0), ('slow_rate', 1800.0), ('fast_speed', 90.0), ('fast_rate', 60.0),
+    ('turn_min', 28.0), ('turn_slope', 255.0), ('turn_time', 15.0),
+)
+
+
+def smart_beaconing_params(value):
+    """Normalize a smart_beaconing setting (true or a mapping) to a hashable tuple, or None."""
+    if not value:
+        return None
+    options = value if isinstance(value, dict) else {}
+    return tuple(float(options.get(name, default)) for name, default in SMART_BEACONING_DEFAULTS)
+
+
+def smart_beacon_due(track, t0, course0, params, loop=False):
+    """Track time of the next SmartBeaconing send after one at `t0` heading `course0`.
+
+    Walks the segments ahead of `t0`: a send is due when the time since the
+    last one exceeds the speed-dependent rate, or when the course has turned
+    more than the speed-dependent threshold after at least turn_time. Looping
+    tracks carry on into the next lap; a track parked at its end falls back
+    to slow_rate.
+    """
+    slow_speed, slow_rate, fast_speed, fast_rate, turn_min, turn_slope, turn_time = params
+    first = track.segment(t0)
+    offset = 0.0
+    while True:
+        for i in range(first, len(track.times) - 1):
+            start = max(track.times[i] + offset, t0)
+            course, speed = track.velocity(i)
+            if speed <= slow_speed:
+                rate = slow_rate
+            elif speed >= fast_speed:
+                rate = fast_rate
+            else:
+                rate = fast_rate * fast_speed / speed
+            if start - t0 >= turn_time and speed > slow_speed:
+                turned = abs((course - course0 + 180) % 360 - 180)
+                if turned > turn_min + turn_slope / speed:
+                    return start
+            if t0 + rate <= track.times[i + 1] + offset:
+                return max(start, t0 + rate)
+        # Laps past slow_rate cannot hold an earlier send
+        if not loop or offset > slow_rate:
+            return t0 + slow_rate
+        first = 0
+        offset += track.duration
+
+
+OBJECT_PACKET = re.compile(r"^([^>]+)>[^:]*:(?:;(.{9})[*_]|\)([^!_]{3,9})[!_])")
+
+
+def load_aprslib():
+    global aprslib
+    if aprslib is None:
+        try:
+            import aprslib as module
+        except ImportError:
+            module = False
+        aprslib = module
+    return aprslib or None
+
+
+def on_air_name(name):
+    """The object name as it appears on APRS-IS: at most 9 characters, padding stripped."""
+    return name[:9].strip()
+
+
+def parse_object_packet(line):
+    """(source, object or item name) of an object/item packet, or None for anything else.
+
+    Parsed with aprslib when it is installed, otherwise with a minimal regex.
+    """
+    lib = load_aprslib()
+    if lib is not None:
+        try:
+            packet = lib.parse(line)
+        except Exception:
+            return None
+        if 'object_name' not in packet:
+            return None
+        return packet['from'], packet['object_name'].strip()
+    match = OBJECT_PACKET.match(line)
+    if match is None:
+        return None
+    return match.group(1), (match.group(2) or match.group(3)).strip()
+
+
+LOG_LEVELS = {'debug': 10, 'info': 20, 'warning': 30, 'error': 40}
+
+# Allowed values of the string options, checked when the config is loaded
+CONFIG_CHOICES = {
+    'engine': ('threads', 'asyncio'),
+    'scheduler': ('threads', 'heap'),
+    'server_selection': ('sequential', 'race'),
+    'log_level': tuple(LOG_LEVELS),
+    'log_format': ('text', 'json'),
+    'worker_mode': ('threads', 'processes'),
+}
+CONFIG_NUMBERS = ('flush_window', 'heartbeat_timeout', 'reconnect_delay', 'reconnect_max',
+                  'metrics_port', 'workers')
+
+
+class ConfigError(ValueError):
+    """A config that failed validation; `problems` lists everything wrong with it."""
+
+    def __init__(self, problems):
+        super().__init__("; ".join(problems))
+        self.problems = problems
+
+
+def is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def check_position(problems, where, item):
+    for key, limit in (('latitude', 90), ('longitude', 180)):
+        if key in item and not (is_number(item[key]) and -limit <= item[key] <= limit):
+            problems.append(f"{where}{key} must be a number between -{limit} and {limit}")
+
+
+def check_smart_beaconing(problems, where, value):
+    names = [name for name, _ in SMART_BEACONING_DEFAULTS]
+    if value is None or isinstance(value, bool):
+        return
+    if not (isinstance(value, dict) and all(
+            key in names and is_number(option) and option >= 0 for key, option in value.items())):
+        problems.append(f"{where}smart_beaconing must be true/false or non-negative numbers for: {', '.join(names)}")
+
+
+def validate_beacon(beacon, label=""):
+    """Problems with one object record; names longer than 9 characters are truncated, not rejected."""
+    if not isinstance(beacon, dict):
+        return [f"{label}must be a mapping"]
+    problems = []
+    name = beacon.get('name')
+    if not isinstance(name, (str, int)) or isinstance(name, bool) or not str(name).strip():
+        problems.append(f"{label}name is required")
+    check_position(problems, label, beacon)
+    if 'interval' in beacon and not (is_number(beacon['interval']) and beacon['interval'] > 0):
+        problems.append(f"{label}interval must be a positive number of minutes")
+    track = beacon.get('track')
+    if track is None:
+        missing = [key for key in ('latitude', 'longitude') if key not in beacon]
+        if missing:
+            problems.append(f"{label}{' and '.join(missing)} required for an object without a track")
+    elif not (isinstance(track, str) or (isinstance(track, dict) and 'path' in track)):
+        problems.append(f"{label}track needs a path")
+    check_smart_beaconing(problems, label, beacon.get('smart_beaconing'))
+    return problems
+
+
+def is_count(value):
+    return isinstance(value, int) and not isinstance(value, bool) and value > 0
+
+
+def validate_station(config, where=""):
+    """Problems with one station's settings, as readable messages."""
+    problems = []
+    if not isinstance(config.get('callsign'), str) or not config['callsign'].strip():
+        problems.append(f"{where}callsign is required")
+    if 'beacon_callsign' in config and not (isinstance(config['beacon_callsign'], str)
+                                            and config['beacon_callsign'].strip()):
+        problems.append(f"{where}beacon_callsign must be a callsign")
+    check_position(problems, where, config)
+    if 'interval' in config and not (is_number(config['interval']) and config['interval'] > 0):
+        problems.append(f"{where}interval must be a positive number of minutes")
+    check_smart_beaconing(problems, where, config.get('smart_beaconing'))
+    for key in CONFIG_NUMBERS:
+        if key in config and not (is_number(config[key]) and config[key] >= 0):
+            problems.append(f"{where}{key} must be a non-negative number")
+    for key, choices in CONFIG_CHOICES.items():
+        if key in config and config[key] not in choices:
+            problems.append(f"{where}{key} must be one of: {', '.join(choices)}")
+
+    servers = config.get('aprs_servers', [])
+    if not isinstance(servers, list) or not all(
+            isinstance(server, dict) and isinstance(server.get('host'), str) and isinstance(server.get('port'), int)
+            for server in servers):
+        problems.append(f"{where}aprs_servers must be a list of host/port entries")
+    rate_limit = config.get('rate_limit')
+    if rate_limit is not None and not (isinstance(rate_limit, dict) and all(
+            key in ('packets_per_second', 'burst') and is_number(value) and value > 0
+            for key, value in rate_limit.items())):
+        problems.append(f"{where}rate_limit takes only positive packets_per_second and burst")
+
+    keepalive = config.get('keepalive')
+    if keepalive not in (None, True, False) and not (isinstance(keepalive, dict) and all(
+            key in ('idle', 'interval', 'count') and is_count(value) for key, value in keepalive.items())):
+        problems.append(f"{where}keepalive must be false or take whole-second idle, interval and count")
+
+    outbox = config.get('outbox')
+    if isinstance(outbox, dict):
+        if not isinstance(outbox.get('path'), str) or not outbox['path']:
+            problems.append(f"{where}outbox needs a path")
+        if 'max_packets' in outbox and not is_count(outbox['max_packets']):
+            problems.append(f"{where}outbox max_packets must be a positive whole number")
+        if 'max_age' in outbox and not (is_number(outbox['max_age']) and outbox['max_age'] > 0):
+            problems.append(f"{where}outbox max_age must be a positive number of seconds")
+        if 'replay_rate' in outbox and not (is_number(outbox['replay_rate']) and outbox['replay_rate'] > 0):
+            problems.append(f"{where}outbox replay_rate must be a positive number of packets per second")
+    elif outbox and not isinstance(outbox, str):
+        problems.append(f"{where}outbox must be a path or a mapping with a path")
+
+    beacons = config.get('beacons') or []
+    if not isinstance(beacons, list):
+        problems.append(f"{where}beacons must be a list")
+        beacons = []
+    for i, beacon in enumerate(beacons, 1):
+        problems.extend(validate_beacon(beacon, f"{where}beacons[{i}]: "))
+
+    sources = config.get('object_sources') or []
+    if not isinstance(sources, list):
+        problems.append(f"{where}object_sources must be a list")
+        sources = []
+    for i, source in enumerate(sources, 1):
+        if not isinstance(source, dict) or source.get('type') not in OBJECT_SOURCES or not source.get('path'):
+            problems.append(f"{where}object_sources[{i}]: needs a path and a type of {', '.join(OBJECT_SOURCES)}")
+    return problems
+
+
+def validate_config(config):
+    """Check a whole config up front so mistakes are reported at load, not as KeyErrors later."""
+    if not isinstance(config, dict):
+        return ["the config must be a mapping of settings"]
+    if 'stations' not in config:
+        return validate_station(config)
+
+    stations = config['stations']
+    if not isinstance(stations, list) or not stations or not all(isinstance(s, dict) for s in stations):
+        return ["stations must be a non-empty list of station profiles"]
+    problems = []
+    defaults = {key: value for key, value in config.items() if key not in POOL_KEYS}
+    for i, station in enumerate(stations, 1):
+        problems.extend(validate_station({**defaults, **station}, f"stations[{i}]: "))
+        for key in PROCESS_KEYS:
+            if key in station:
+                problems.append(f"stations[{i}]: {key} applies to the whole daemon, set it at the top level")
+    for key in ('metrics_port', 'workers'):
+        if key in config and not (is_number(config[key]) and config[key] >= 0):
+            problems.append(f"{key} must be a non-negative number")
+    for key, choices in CONFIG_CHOICES.items():
+        if key.startswith('log_') or key == 'worker_mode':
+            if key in config and config[key] not in choices:
+                problems.append(f"{key} must be one of: {', '.join(choices)}")
+    if config.get('control_socket'):
+        problems.append("control_socket controls one station and is not available with stations")
+    if config.get('metrics_port') and config.get('worker_mode', 'threads') == 'processes':
+        problems.append("metrics_port needs worker_mode: threads, worker processes have no shared registry")
+    return problems
+
+
+SNAPSHOT_VERSION = 1
+
+
+def load_config_file(path):
+    """Parse and validate a YAML config, reusing a compiled snapshot while the file is unchanged.
+
+    The snapshot (path + '.snapshot') is a marshal dump of the validated
+    config keyed by the file's mtime, size and SHA-256. An untouched file is
+    loaded without reading the YAML or importing yaml; a rewritten but
+    identical file only costs a hash.
+    """
+    stat = os.stat(path)
+    snapshot_file = path + '.snapshot'
+    try:
+        with open(snapshot_file, 'rb') as f:
+            snapshot = marshal.load(f)
+        if not (isinstance(snapshot, tuple) and len(snapshot) == 5 and snapshot[0] == SNAPSHOT_VERSION):
+            snapshot = None
+    except (OSError, EOFError, ValueError, TypeError):
+        snapshot = None
+    if snapshot and snapshot[1:3] == (stat.st_mtime_ns, stat.st_size):
+        return snapshot[4]
+
+    with open(path, 'rb') as f:
+        data = f.read()
+    digest = hashlib.sha256(data).hexdigest()
+    if snapshot and snapshot[3] == digest:
+        config = snapshot[4]
+    else:
+        config = yaml.safe_load(data) or {}
+        problems = validate_config(config)
+        if problems:
+            raise ConfigError(problems)
+
+    try:
+        # YAML values marshal can't store (dates, ...) just mean no snapshot
+        blob = marshal.dumps((SNAPSHOT_VERSION, stat.st_mtime_ns, stat.st_size, digest, config))
+        with open(snapshot_file + '.tmp', 'wb') as f:
+            f.write(blob)
+        os.replace(snapshot_file + '.tmp', snapshot_file)
+    except (OSError, ValueError):
+        pass
+    return config
+
+
+def configure_logger(logger, config):
+    logger.configure(config.get('log_level', 'info'), config.get('log_format', 'text') == 'json',
+                     config.get('log_file'))
+
+
+class LogWriter:
+    """Buffered log output: callers only enqueue, a background thread formats,
+    writes and flushes in batches, so senders never wait on a slow terminal or pipe.
+    """
+
+    def __init__(self, level='info', json_lines=False, path=None, flush_interval=0.2):
+        self.level = LOG_LEVELS.get(level, 20)
+        self.json_lines = json_lines
+        self.path = path
+        self.flush_interval = flush_interval
+        self.records = queue.SimpleQueue()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def configure(self, level='info', json_lines=False, path=None):
+        self.level = LOG_LEVELS.get(level, 20)
+        self.json_lines = json_lines
+        self.path = path
+
+    def enabled(self, level):
+        return LOG_LEVELS.get(level, 20) >= self.level
+
+    def write(self, level, message, fields):
+        if self.enabled(level):
+            self.records.put((time.time(), level, message, fields))
+
+    def format(self, record):
+        created, level, message, fields = record
+        if self.json_lines:
+            entry = {'time': datetime.fromtimestamp(created).isoformat(timespec='milliseconds'),
+                     'level': level, 'message': message}
+            entry.update(fields)
+            return json.dumps(entry, ensure_ascii=False) + "\n"
+        timestamp = datetime.fromtimestamp(created).strftime("%Y-%m-%d %H:%M:%S")
+        prefix = "" if level == 'info' else f"[{level.upper()}] "
+        return f"[{timestamp}] {prefix}{message}\n"
+
+    def run(self):
+        stream = None
+        last_flush = time.monotonic()
+        while True:
+            try:
+                record = self.records.get(timeout=self.flush_interval)
+            except queue.Empty:
+                record = None
+
+            batch = [] if record is None else [record]
+            while len(batch) < 1000:
+                try:
+                    batch.append(self.records.get_nowait())
+                except queue.Empty:
+                    break
+
+            closing = None in batch
+            lines = "".join(self.format(r) for r in batch if r is not None)
+            if self.path and stream is None:
+                stream = open(self.path, 'a', encoding='utf-8')
+            out = stream or sys.stdout
+            try:
+                if lines:
+                    out.write(lines)
+                if closing or (self.records.empty() and time.monotonic() - last_flush >= self.flush_interval):
+                    out.flush()
+                    last_flush = time.monotonic()
+            except (OSError, ValueError):
+                pass
+            if closing:
+                if stream:
+                    stream.close()
+                return
+
+    def close(self):
+        """Flush everything queued so far and stop the writer thread."""
+        if self.thread.is_alive():
+            self.records.put(None)
+            self.thread.join(timeout=5)
+
+
+class Metrics:
+    """Small Prometheus-style registry of labelled counters, gauges and histograms."""
+
+    BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.types = {}
+        self.values = {}
+        self.histograms = {}
+        self.collectors = []
+
+    def labels_key(self, labels):
+        return tuple(sorted(labels.items()))
+
+    def inc(self, name, value=1, **labels):
+        key = (name, self.labels_key(labels))
+        with self.lock:
+            self.types[name] = 'counter'
+            self.values[key] = self.values.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        with self.lock:
+            self.types[name] = 'gauge'
+            self.values[(name, self.labels_key(labels))] = value
+
+    def observe(self, name, value, **labels):
+        key = (name, self.labels_key(labels))
+        with self.lock:
+            self.types[name] = 'histogram'
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = [0] * len(self.BUCKETS) + [0, 0.0]
+            for i, bound in enumerate(self.BUCKETS):
+                if value <= bound:
+                    histogram[i] += 1
+            histogram[-2] += 1
+            histogram[-1] += value
+
+    def timed(self, name, func):
+        """Wrap `func` so every call is recorded in the aprs_function_seconds histogram."""
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.observe('aprs_function_seconds', time.perf_counter() - started, function=name)
+        return wrapper
+
+    def timed_async(self, name, func):
+        """Coroutine version of `timed`."""
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                self.observe('aprs_function_seconds', time.perf_counter() - started, function=name)
+        return wrapper
+
+    def value(self, name, **labels):
+        return self.values.get((name, self.labels_key(labels)), 0)
+
+    def format_labels(self, labels, extra=()):
+        pairs = list(labels) + list(extra)
+        if not pairs:
+            return ""
+        escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in pairs)
+        return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+    def render(self):
+        """Return the registry in the Prometheus text exposition format."""
+        for collect in self.collectors:
+            collect()
+
+        lines = []
+        with self.lock:
+            for name in sorted(self.types):
+                lines.append(f"# TYPE {name} {self.types[name]}")
+                if self.types[name] == 'histogram':
+                    for (metric, labels), histogram in self.histograms.items():
+                        if metric != name:
+                            continue
+                        for bound, count in zip(self.BUCKETS, histogram):
+                            lines.append(f"{name}_bucket{self.format_labels(labels, [('le', bound)])} {count}")
+                        lines.append(f"{name}_bucket{self.format_labels(labels, [('le', '+Inf')])} {histogram[-2]}")
+                        lines.append(f"{name}_sum{self.format_labels(labels)} {histogram[-1]}")
+                        lines.append(f"{name}_count{self.format_labels(labels)} {histogram[-2]}")
+                else:
+                    for (metric, labels), value in self.values.items():
+                        if metric == name:
+                            lines.append(f"{name}{self.format_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def metrics_server(address, metrics):
+    """HTTP server for /metrics; http.server is only imported when metrics are enabled."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = self.server.metrics.render().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(address, MetricsHandler)
+    server.daemon_threads = True
+    server.metrics = metrics
+    return server
+
+
+class ControlHandler(socketserver.StreamRequestHandler):
+    """One control client: line-delimited JSON requests, one JSON response per line.
+
+    A {"cmd": "subscribe"} request turns the connection into an event stream.
+    """
+
+    def handle(self):
+        beacon = self.server.beacon
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+            except ValueError:
+                self.reply({'ok': False, 'error': 'invalid JSON'})
+                continue
+            if request.get('cmd') == 'subscribe':
+                self.stream_events(beacon)
+                return
+            self.reply(beacon.handle_control(request))
+
+    def reply(self, message):
+        self.wfile.write((json.dumps(message) + "\n").encode('utf-8'))
+        self.wfile.flush()
+
+    def stream_events(self, beacon):
+        events = beacon.subscribe()
+        try:
+            self.reply({'ok': True, 'event': 'subscribed'})
+            while beacon.running or not events.empty():
+                try:
+                    self.reply(events.get(timeout=1.0))
+                except queue.Empty:
+                    continue
+        except OSError:
+            pass
+        finally:
+            beacon.unsubscribe(events)
+
+
+def tune_keepalive(sock, idle, interval, count):
+    """Enable TCP keepalive so a half-open session errors out after about idle + interval * count seconds."""
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    if hasattr(socket, 'TCP_KEEPIDLE'):
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, idle)
+    elif hasattr(socket, 'TCP_KEEPALIVE'):
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPALIVE, idle)
+    if hasattr(socket, 'TCP_KEEPINTVL'):
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, interval)
+    if hasattr(socket, 'TCP_KEEPCNT'):
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPCNT, count)
+    if hasattr(socket, 'TCP_USER_TIMEOUT'):
+        # Also give up on sends the server never acknowledges
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_USER_TIMEOUT, (idle + interval * count) * 1000)
+
+
+class Outbox:
+    """SQLite store for packets that could not be delivered, replayed after reconnect.
+
+    Keyed packets are coalesced per station and beacon, so a long outage keeps
+    at most one (the newest) packet per object; max_packets and max_age bound
+    the rest.
+    """
+
+    def __init__(self, path, station, max_packets=10000, max_age=3600):
+        self.station = station
+        self.max_packets = max_packets
+        self.max_age = max_age
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS outbox (
+            id INTEGER PRIMARY KEY, station TEXT NOT NULL, key TEXT, due REAL NOT NULL,
+            packet BLOB NOT NULL, UNIQUE (station, key))""")
+        self.conn.commit()
+        self.pending = self.count()
+
+    def count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM outbox WHERE station = ?", (self.station,)).fetchone()[0]
+
+    def save(self, batch):
+        """Store (key, packet, queued monotonic time) entries under their original due time."""
+        offset = time.time() - time.monotonic()
+        rows = [(self.station, key or None, queued + offset, packet) for key, packet, queued in batch]
+        with self.lock:
+            self.conn.executemany(
+                "INSERT INTO outbox (station, key, due, packet) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (station, key) DO UPDATE SET due = excluded.due, packet = excluded.packet "
+                "WHERE excluded.due >= outbox.due", rows)
+            self.conn.execute(
+                "DELETE FROM outbox WHERE id IN (SELECT id FROM outbox WHERE station = ? "
+                "ORDER BY due DESC LIMIT -1 OFFSET ?)", (self.station, self.max_packets))
+            self.conn.commit()
+            self.pending = self.count()
+
+    def take(self, limit):
+        """Remove and return up to `limit` of the oldest packets, as writer batch entries."""
+        offset = time.time() - time.monotonic()
+        with self.lock:
+            self.conn.execute("DELETE FROM outbox WHERE station = ? AND due < ?",
+                              (self.station, time.time() - self.max_age))
+            rows = self.conn.execute(
+                "SELECT id, key, due, packet FROM outbox WHERE station = ? ORDER BY due LIMIT ?",
+                (self.station, limit)).fetchall()
+            self.conn.executemany("DELETE FROM outbox WHERE id = ?", [(row[0],) for row in rows])
+            self.conn.commit()
+            self.pending = self.count()
+        return [(key or '', bytes(packet), due - offset) for _, key, due, packet in rows]
+
+    def discard(self, keys):
+        """Drop saved packets superseded by newer ones just sent live for the same beacons."""
+        with self.lock:
+            self.conn.executemany("DELETE FROM outbox WHERE station = ? AND key = ?",
+                                  [(self.station, key) for key in keys])
+            self.conn.commit()
+            self.pending = self.count()
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+class TokenBucket:
+    """Token bucket refilled at `rate` tokens per second, holding at most `burst`."""
+
+    def __init__(self, rate, burst):
+        self.rate = float(rate)
+        self.burst = max(1.0, float(burst))
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self, count=1):
+        """Take `count` tokens and return how many seconds to wait before using them."""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= count
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def acquire(self, count=1):
+        delay = self.reserve(count)
+        if delay > 0:
+            time.sleep(delay)
+
+
 class APRSBeacon:
-    def __init__(self, config_file="config.yaml"):
+    def __init__(self, config_file="config.yaml", config=None, logger=None):
         self.config_file = config_file
+        self.station = None
         self.config = {}
         self.running = False
+        self.stopping = False
+        self.first_packet = None
+        # Engine and scheduler actually running; a reload cannot switch them
+        self.engine = None
+        self.scheduler = None
         self.threads = []
+        self.stop_event = threading.Event()
+        self.outgoing = queue.Queue()
+        self.packet_cache = {}
+        self.tracks = {}
+        self.track_state = {}
+        self.outbox = None
+        self.replay_limiter = None
+        self.stream_lock = threading.Lock()
+        self.sent_index = OrderedDict()
+        self.conflicts = OrderedDict()
+        self.last_heard = None
+        self.reconnect_failures = 0
+        self.reconnect_at = 0.0
+        self.rate_limiter = None
+        self.writer_thread = None
         self.aprs_socket = None
+        self.aprs_reader = None
+        self.aprs_writer = None
+        self.reader_task = None
+        self.send_queue = None
+        self.loop = None
+        self.async_stop = None
         self.login_callsign = ""
         self.beacon_callsign = ""
         self.aprs_servers = []
+        self.server_stats = {}
+        self.stats_lock = threading.Lock()
+        self.failover_seconds = None
+        self.jobs = {}
+        self.on_air_names = {}
+        self.job_tasks = {}
+        self.pending_jobs = []
+        self.schedule_lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.reload_lock = threading.Lock()
+        self.reload_requested = threading.Event()
+        self.reconnect_requested = False
+        self.config_mtime = None
+        self.metrics = Metrics()
+        self.metrics.collectors.append(self.collect_metrics)
+        self.metrics_server = None
+        self.connected_at = None
+        self.connections = 0
+        self.control_server = None
+        self.subscribers = []
+        self.paused = set()
+        self.logger = logger
+        # Station beacons share their pool's writer, which the top-level config configures
+        self.owns_logger = logger is None
+        if self.logger is None:
+            self.logger = LogWriter()
+            atexit.register(self.logger.close)
+
+        if config is not None:
+            # A station profile run by StationPool, which owns signals and config watching
+            self.apply_config(config)
+            self.station = self.login_callsign
+            return
 
         self.load_config()
+        if self.config.get('profile_hooks', False):
+            # Time the code that touches the network; send_packet only queues
+            self.write_batch = self.metrics.timed('write_batch', self.write_batch)
+            self.connect_aprs_is = self.metrics.timed('connect_aprs_is', self.connect_aprs_is)
+            self.async_write_batch = self.metrics.timed_async('async_write_batch', self.async_write_batch)
+            self.async_connect_aprs_is = self.metrics.timed_async('async_connect_aprs_is',
+                                                                  self.async_connect_aprs_is)
         signal.signal(signal.SIGINT, self.signal_handler)
         signal.signal(signal.SIGTERM, self.signal_handler)
+        if hasattr(signal, 'SIGHUP'):
+            signal.signal(signal.SIGHUP, self.reload_signal_handler)
 
-    def load_config(self):
-        try:
-            with open(self.config_file, 'r') as f:
-                self.config = yaml.safe_load(f)
+    def read_config(self):
+        # Record the mtime first so a broken file is reported once, not on every poll
+        self.config_mtime = os.stat(self.config_file).st_mtime
+        return load_config_file(self.config_file)
+
+    def apply_config(self, config):
+        self.config = config
+        if self.owns_logger:
+            configure_logger(self.logger, self.config)
+        self.login_callsign = self.config.get('callsign', '').strip().upper()
+        self.beacon_callsign = self.config.get('beacon_callsign', self.login_callsign).strip().upper()
+        self.aprs_servers = self.config.get("aprs_servers", [
+            {"host": "aprs.hamradio.my", "port": 14580},
+            {"host": "rotate.aprs.net", "port": 14580}
+        ])
 
-            self.login_callsign = self.config.get('callsign', '').strip().upper()
-            self.beacon_callsign = self.config.get('beacon_callsign', self.login_callsign).strip().upper()
-            self.aprs_servers = self.config.get("aprs_servers", [
-                {"host": "aprs.hamradio.my", "port": 14580},
-                {"host": "rotate.aprs.net", "port": 14580}
-            ])
+        self.rate_limiter = None
+        rate_limit = self.config.get('rate_limit')
+        if rate_limit:
+            self.rate_limiter = TokenBucket(rate_limit.get('packets_per_second', 1),
+                                            rate_limit.get('burst', 1))
 
+    def load_config(self):
+        try:
+            self.apply_config(self.read_config())
             self.log("✅ Configuration loaded successfully")
+        except ConfigError as e:
+            self.log(f"❌ Invalid config in {self.config_file}:", 'error')
+            for problem in e.problems:
+                self.log(f"   • {problem}", 'error')
+            self.logger.close()
+            sys.exit(1)
         except Exception as e:
-            self.log(f"❌ Error loading config: {e}")
+            self.log(f"❌ Error loading config: {e}", 'error')
+            self.logger.close()
             sys.exit(1)
 
-    def log(self, message):
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        print(f"[{timestamp}] {message}")
-        sys.stdout.flush()
+    def reload_config(self, config=None):
+        """Re-read the config and apply only what changed, keeping the APRS-IS session."""
+        with self.reload_lock:
+            started = time.monotonic()
+            old_login = (self.login_callsign, str(self.config.get('passcode', '')), self.aprs_servers)
+            old_rate_limiter = self.rate_limiter
+            try:
+                if config is None:
+                    config = self.read_config()
+            except Exception as e:
+                self.log(f"❌ Error reloading config, keeping current one: {e}", 'error')
+                return False
+
+            rate_limit_changed = config.get('rate_limit') != self.config.get('rate_limit')
+            if self.engine and config.get('engine', 'threads') != self.engine:
+                self.log(f"⚠ Changing engine needs a restart, still running {self.engine}", 'warning')
+            elif self.scheduler and config.get('scheduler', 'threads') != self.scheduler:
+                self.log(f"⚠ Changing scheduler needs a restart, still running {self.scheduler}", 'warning')
+            self.apply_config(config)
+            if not rate_limit_changed:
+                self.rate_limiter = old_rate_limiter
+
+            new_login = (self.login_callsign, str(self.config.get('passcode', '')), self.aprs_servers)
+            if new_login != old_login:
+                self.log("🔁 Login settings changed, reconnecting")
+                self.reconnect_requested = True
+
+            new_jobs = self.build_jobs()
+            removed = [key for key in self.jobs if key not in new_jobs]
+            changed = [job for key, job in new_jobs.items() if self.jobs.get(key) != job]
+            self.apply_job_changes(changed, removed)
+
+            elapsed = (time.monotonic() - started) * 1000
+            self.log(f"🔄 Config reloaded in {elapsed:.1f} ms: {len(changed)} added/updated, {len(removed)} removed")
+            return True
+
+    def apply_job_changes(self, changed, removed):
+        """Swap changed jobs into the running set and retire removed ones."""
+        fresh = {job.key for job in changed if job.key not in self.jobs}
+        for key in removed:
+            self.jobs.pop(key, None)
+            self.paused.discard(key)
+            self.track_state.pop(key, None)
+            if self.on_air_names.get(on_air_name(key)) == key:
+                del self.on_air_names[on_air_name(key)]
+        for job in changed:
+            self.jobs[job.key] = job
+            self.on_air_names[on_air_name(job.key)] = job.key
+            self.track_state.pop(job.key, None)
+        self.prune_packet_cache(self.jobs.values())
+        self.warm_packet_cache(changed)
+        self.activate_jobs(changed, removed, fresh)
+        if changed or removed:
+            self.emit_event('jobs', changed=[job.key for job in changed][:100], removed=removed[:100],
+                            beacons=len(self.jobs))
+
+    def config_watcher(self):
+        """Reload on SIGHUP, or when the config file's mtime changes if watch_config is on."""
+        while self.running:
+            if self.reload_requested.wait(1.0):
+                self.reload_requested.clear()
+                if self.running:
+                    self.safe_reload()
+                continue
+
+            if not self.config.get('watch_config', True):
+                continue
+            try:
+                mtime = os.stat(self.config_file).st_mtime
+            except OSError:
+                continue
+            if mtime != self.config_mtime:
+                self.safe_reload()
+
+    def safe_reload(self):
+        # An unexpected error must not end the watcher, or hot reload stays dead until restart
+        try:
+            self.reload_config()
+        except Exception as e:
+            self.log(f"❌ Error applying reloaded config: {e}", 'error')
+
+    def log(self, message, level='info', **fields):
+        if self.station:
+            message = f"[{self.station}] {message}"
+            fields['station'] = self.station
+        self.logger.write(level, message, fields)
+        if self.subscribers and self.logger.enabled(level):
+            self.emit_event('log', level=level, message=message)
+
+    def subscribe(self):
+        events = queue.Queue(maxsize=10000)
+        self.subscribers.append(events)
+        return events
+
+    def unsubscribe(self, events):
+        if events in self.subscribers:
+            self.subscribers.remove(events)
+
+    def emit_event(self, event, **data):
+        """Push an event to every control-socket subscriber; slow subscribers lose events."""
+        data['event'] = event
+        data['time'] = time.time()
+        for events in list(self.subscribers):
+            try:
+                events.put_nowait(data)
+            except queue.Full:
+                pass
 
     def signal_handler(self, signum, frame):
         self.log("🛑 Shutdown signal received")
         self.stop()
 
-    def connect_aprs_is(self):
-        callsign = self.login_callsign
+    def reload_signal_handler(self, signum, frame):
+        self.log("🔄 Reload signal received")
+        self.reload_requested.set()
+
+    def login_line(self):
         passcode = str(self.config.get('passcode', ''))
+        line = f"user {self.login_callsign} pass {passcode} vers ManualLogin 1.0"
+        if self.config.get('filter'):
+            line += f" filter {self.config['filter']}"
+        return line + "\r\n"
+
+    def login_verified(self, response):
+        response = response.lower()
+        return "logresp" in response and re.search(r"\bverified\b", response) is not None
+
+    def login_to_server(self, host, port):
+        """Open a TCP session to one server and log in; return the socket or None."""
+        self.log(f"🔗 Connecting to APRS-IS server: {host}:{port}")
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        try:
+            sock.settimeout(30)
+            sock.connect((host, port))
+            self.log("✅ TCP connection established")
+
+            login_str = self.login_line()
+            # No settle delay: the server queues the login behind its banner line
+            self.log(f"📤 Sending login: {login_str.strip()}")
+            sock.sendall(login_str.encode('utf-8'))
+
+            # Receive multiple lines from server
+            response = ""
+            sock.settimeout(5.0)
+            try:
+                while True:
+                    chunk = sock.recv(1024).decode("utf-8")
+                    if not chunk:
+                        break
+                    response += chunk
+                    if "logresp" in response.lower():
+                        break
+            except socket.timeout:
+                pass
+
+            self.log("📥 Server response:\n" + response.strip())
+        except Exception:
+            sock.close()
+            raise
+
+        if self.login_verified(response):
+            self.log(f"✅ Logged in as {self.login_callsign} via {host}:{port}")
+            return sock
+
+        self.log(f"❌ Login rejected by {host}:{port}", 'error')
+        sock.close()
+        return None
+
+    def record_server_result(self, server, rtt):
+        """Remember login RTT (None on failure) so reconnects try the best server first."""
+        key = f"{server['host']}:{server['port']}"
+        if rtt is None:
+            self.metrics.inc('aprs_login_failures_total', server=key)
+        else:
+            self.metrics.set('aprs_login_rtt_seconds', rtt, server=key)
+        with self.stats_lock:
+            stats = self.server_stats.setdefault(key, {'rtt': None, 'failures': 0})
+            if rtt is None:
+                stats['failures'] += 1
+            else:
+                stats['rtt'] = rtt
+                stats['failures'] = 0
+
+    def ranked_servers(self):
+        """Healthy servers first, fastest measured RTT first, then config order."""
+        def rank(item):
+            index, server = item
+            stats = self.server_stats.get(f"{server['host']}:{server['port']}", {})
+            rtt = stats.get('rtt')
+            return (stats.get('failures', 0), rtt if rtt is not None else float('inf'), index)
+
+        with self.stats_lock:
+            return [server for _, server in sorted(enumerate(self.aprs_servers), key=rank)]
+
+    def try_server(self, server):
+        started = time.monotonic()
+        try:
+            sock = self.login_to_server(server['host'], server['port'])
+        except Exception as e:
+            self.log(f"❌ Connection failed: {e}", 'error')
+            sock = None
+        self.record_server_result(server, time.monotonic() - started if sock else None)
+        return sock
+
+    def race_servers(self):
+        """Log in to every server at once and keep the first verified session."""
+        winner = queue.Queue()
+        lock = threading.Lock()
+        state = {'won': False, 'pending': len(self.aprs_servers)}
+
+        def attempt(server):
+            sock = self.try_server(server)
+            with lock:
+                state['pending'] -= 1
+                if sock and not state['won']:
+                    state['won'] = True
+                    winner.put(sock)
+                    return
+                if not state['won'] and state['pending'] == 0:
+                    winner.put(None)
+            if sock:
+                sock.close()
 
         for server in self.aprs_servers:
-            host = server['host']
-            port = server['port']
+            threading.Thread(target=attempt, args=(server,), daemon=True).start()
+        return winner.get()
+
+    def connect_aprs_is(self):
+        started = time.monotonic()
+        if self.config.get('server_selection', 'sequential') == 'race' and self.aprs_servers:
+            self.aprs_socket = self.race_servers()
+        else:
+            self.aprs_socket = None
+            for server in self.ranked_servers():
+                self.aprs_socket = self.try_server(server)
+                if self.aprs_socket:
+                    break
+
+        if self.aprs_socket:
+            self.failover_seconds = time.monotonic() - started
+            self.log(f"⏱ Connected in {self.failover_seconds:.3f}s")
+            self.connection_established()
+            return True
+
+        self.log("❌ All APRS-IS connection attempts failed", 'error')
+        return False
+
+    def connection_established(self):
+        if self.connections:
+            self.metrics.inc('aprs_reconnects_total')
+        self.connections += 1
+        self.connected_at = time.monotonic()
+        self.emit_event('state', connected=True, connections=self.connections)
+        if self.failover_seconds is not None:
+            self.metrics.set('aprs_failover_seconds', self.failover_seconds)
+        self.last_heard = time.monotonic()
+        self.reconnect_failures = 0
+        self.reconnect_at = 0.0
+
+        if self.aprs_reader is not None:
+            sock = self.aprs_writer.get_extra_info('socket')
+        else:
+            sock = self.aprs_socket
+            # Login used short timeouts; from here on a send stalled this long means a dead link
+            sock.settimeout(30)
+        keepalive = self.config.get('keepalive', {})
+        if keepalive is not False and sock is not None:
+            keepalive = keepalive if isinstance(keepalive, dict) else {}
             try:
-                self.log(f"🔗 Connecting to APRS-IS server: {host}:{port}")
-                self.aprs_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                self.aprs_socket.settimeout(30)
-                self.aprs_socket.connect((host, port))
-                self.log("✅ TCP connection established")
+                tune_keepalive(sock, int(keepalive.get('idle', 30)), int(keepalive.get('interval', 10)),
+                               int(keepalive.get('count', 3)))
+            except OSError as e:
+                self.log(f"⚠ Could not enable TCP keepalive: {e}", 'warning')
 
-                login_str = f"user {callsign} pass {passcode} vers ManualLogin 1.0\r\n"
-                time.sleep(1.0)
-                self.log(f"📤 Sending login: {login_str.strip()}")
-                self.aprs_socket.sendall(login_str.encode('utf-8'))
+        if self.aprs_reader is not None:
+            self.reader_task = asyncio.create_task(self.async_read_stream(self.aprs_reader))
+        elif self.aprs_socket is not None:
+            threading.Thread(target=self.read_stream, args=(self.aprs_socket,), daemon=True).start()
 
-                # Receive multiple lines from server
-                response = ""
-                self.aprs_socket.settimeout(5.0)
-                try:
-                    while True:
-                        chunk = self.aprs_socket.recv(1024).decode("utf-8")
-                        if not chunk:
-                            break
-                        response += chunk
-                        if "logresp" in response.lower():
-                            break
-                except socket.timeout:
-                    pass
-
-                self.log("📥 Server response:\n" + response.strip())
-
-                if "logresp" in response.lower() and "verified" in response.lower():
-                    self.log(f"✅ Logged in as {callsign}")
-                    return True
-                else:
-                    self.log(f"❌ Login rejected")
-                    self.aprs_socket.close()
-                    self.aprs_socket = None
+    def connection_lost(self, reason, message):
+        """Called by the reader or the watchdog; the writer reconnects on its next pass."""
+        self.log(message, 'warning')
+        self.metrics.inc('aprs_dead_connections_total', reason=reason)
+        self.reconnect_requested = True
+
+    def connection_stale(self):
+        """True when the server has been silent for longer than heartbeat_timeout.
+
+        APRS-IS servers send a # comment line about every 20 seconds, so
+        silence means the session is gone even if TCP hasn't noticed yet.
+        """
+        timeout = self.config.get('heartbeat_timeout', 60)
+        if not timeout or self.last_heard is None:
+            return False
+        silent = time.monotonic() - self.last_heard
+        if silent <= timeout:
+            return False
+        self.last_heard = None
+        self.connection_lost('heartbeat', f"💓 Nothing from APRS-IS for {silent:.0f}s, reconnecting")
+        return True
+
+    def back_off(self):
+        """Delay the next connection attempt: exponential backoff with jitter."""
+        self.reconnect_failures += 1
+        base = float(self.config.get('reconnect_delay', 1))
+        ceiling = float(self.config.get('reconnect_max', 300))
+        delay = min(ceiling, base * 2 ** (self.reconnect_failures - 1))
+        delay = random.uniform(delay / 2, delay)
+        self.reconnect_at = time.monotonic() + delay
+        self.log(f"⏳ Next connection attempt in {delay:.1f}s", 'warning')
+
+    def maintain_connection(self):
+        """Make sure there is a live session, reconnecting right away when it died.
+
+        Returns whether the writer can send now. Only the writer calls this.
+        """
+        if self.aprs_socket is not None:
+            self.connection_stale()
+        if self.reconnect_requested:
+            self.reconnect_requested = False
+            self.disconnect_aprs_is()
+        if self.aprs_socket is None:
+            if not self.running or time.monotonic() < self.reconnect_at:
+                return False
+            if not self.connect_aprs_is():
+                self.back_off()
+                return False
+        return True
+
+    async def async_maintain_connection(self):
+        if self.aprs_writer is not None:
+            self.connection_stale()
+        if self.reconnect_requested:
+            self.reconnect_requested = False
+            self.async_disconnect_aprs_is()
+        if self.aprs_writer is None:
+            if not self.running or time.monotonic() < self.reconnect_at:
+                return False
+            if not await self.async_connect_aprs_is():
+                self.back_off()
+                return False
+        return True
+
+    def read_stream(self, sock):
+        """Drain everything the server sends on this session, one line at a time."""
+        buffer = b""
+        while not self.stopping and sock is self.aprs_socket:
+            try:
+                chunk = sock.recv(65536)
+            except socket.timeout:
+                continue
+            except OSError as e:
+                if sock is self.aprs_socket:
+                    self.connection_lost('error', f"⚠ Connection lost: {e}")
+                return
+            if not chunk:
+                if sock is self.aprs_socket:
+                    self.connection_lost('eof', "⚠ Server closed the connection")
+                return
+            lines = (buffer + chunk).split(b"\n")
+            buffer = lines.pop()
+            for line in lines:
+                self.handle_stream_line(line.decode('utf-8', errors='replace').rstrip("\r"))
+
+    async def async_read_stream(self, reader):
+        while not self.stopping and reader is self.aprs_reader:
+            try:
+                line = await reader.readline()
             except Exception as e:
-                self.log(f"❌ Connection failed: {e}")
-                self.aprs_socket = None
+                if reader is self.aprs_reader:
+                    self.connection_lost('error', f"⚠ Connection lost: {e}")
+                return
+            if not line:
+                if reader is self.aprs_reader:
+                    self.connection_lost('eof', "⚠ Server closed the connection")
+                return
+            self.handle_stream_line(line.decode('utf-8', errors='replace').rstrip("\r\n"))
 
-        self.log("❌ All APRS-IS connection attempts failed")
-        return False
+    def handle_stream_line(self, line):
+        """Match echoes of our own packets and spot other stations using our object names."""
+        self.last_heard = time.monotonic()
+        if not line:
+            return
+        if line.startswith('#'):
+            self.metrics.inc('aprs_stream_lines_total', type='comment')
+            return
+        self.metrics.inc('aprs_stream_lines_total', type='packet')
+
+        header, _, info = line.partition(':')
+        source = header.split('>', 1)[0]
+        if source == self.beacon_callsign:
+            with self.stream_lock:
+                sent = self.sent_index.pop(info.encode('utf-8'), None)
+            if sent is not None:
+                key, when = sent
+                self.metrics.observe('aprs_echo_latency_seconds', time.monotonic() - when)
+                self.log(f"📬 Echo of {key} after {time.monotonic() - when:.2f}s", 'debug', beacon=key)
+            return
+
+        if info[:1] not in (';', ')'):
+            return
+        parsed = parse_object_packet(line)
+        if parsed is None or parsed[1] not in self.on_air_names:
+            return
+        source, name = parsed[0], self.on_air_names[parsed[1]]
+        conflict = (name, source)
+        with self.stream_lock:
+            if conflict in self.conflicts:
+                self.conflicts.move_to_end(conflict)
+                return
+            self.conflicts[conflict] = time.monotonic()
+            if len(self.conflicts) > CONFLICT_INDEX_SIZE:
+                self.conflicts.popitem(last=False)
+        self.metrics.inc('aprs_object_conflicts_total', beacon=name)
+        self.log(f"⚠ Object {name} is also being beaconed by {source}", 'warning', beacon=name, source=source)
+
+    def collect_metrics(self):
+        """Refresh point-in-time gauges just before a scrape."""
+        connected = self.aprs_socket is not None or self.aprs_writer is not None
+        uptime = time.monotonic() - self.connected_at if connected and self.connected_at else 0
+        self.metrics.set('aprs_connection_uptime_seconds', uptime)
+        self.metrics.set('aprs_queue_depth', self.send_queue.qsize() if self.send_queue else self.outgoing.qsize())
+        self.metrics.set('aprs_beacons', len(self.jobs))
+        if self.outbox:
+            self.metrics.set('aprs_outbox_depth', self.outbox.pending)
+
+    def start_metrics_server(self):
+        port = self.config.get('metrics_port')
+        if not port or self.metrics_server:
+            return
+        try:
+            self.metrics_server = metrics_server((self.config.get('metrics_host', '127.0.0.1'), port),
+                                                 self.metrics)
+        except OSError as e:
+            self.log(f"❌ Metrics endpoint failed to start: {e}", 'error')
+            return
+        threading.Thread(target=self.metrics_server.serve_forever, daemon=True).start()
+        self.log(f"📊 Metrics on http://{self.metrics_server.server_address[0]}:{port}/metrics")
+
+    def start_control_server(self):
+        path = self.config.get('control_socket')
+        if not path or self.control_server:
+            return
+        if not hasattr(socket, 'AF_UNIX'):
+            self.log("⚠ Control socket needs Unix domain socket support", 'warning')
+            return
+        if os.path.exists(path):
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(path)
+                self.log(f"❌ Control socket {path} is in use by another beacon", 'error')
+                return
+            except OSError:
+                os.unlink(path)
+            finally:
+                probe.close()
+        try:
+            self.control_server = socketserver.ThreadingUnixStreamServer(path, ControlHandler)
+        except OSError as e:
+            self.log(f"❌ Control socket failed to start: {e}", 'error')
+            return
+        self.control_server.daemon_threads = True
+        self.control_server.beacon = self
+        threading.Thread(target=self.control_server.serve_forever, daemon=True).start()
+        self.log(f"🎛 Control socket on {path}")
+
+    def stop_control_server(self):
+        if self.control_server:
+            self.control_server.shutdown()
+            self.control_server.server_close()
+            try:
+                os.unlink(self.config.get('control_socket'))
+            except OSError:
+                pass
+            self.control_server = None
+
+    def handle_control(self, request):
+        """Dispatch one control request to its control_<cmd> method."""
+        handler = getattr(self, f"control_{request.get('cmd', '')}", None)
+        if handler is None:
+            return {'ok': False, 'error': f"unknown command: {request.get('cmd')}"}
+        try:
+            response = handler(request)
+        except Exception as e:
+            return {'ok': False, 'error': str(e)}
+        response.setdefault('ok', True)
+        return response
+
+    def control_ping(self, request):
+        return {}
+
+    def control_status(self, request):
+        connected = self.aprs_socket is not None or self.aprs_writer is not None
+        return {
+            'running': self.running,
+            'engine': self.engine or self.config.get('engine', 'threads'),
+            'callsign': self.login_callsign,
+            'dry_run': self.config.get('dry_run', False),
+            'connected': connected,
+            'uptime': time.monotonic() - self.connected_at if connected and self.connected_at else 0,
+            'connections': self.connections,
+            'beacons': len(self.jobs),
+            'paused': sorted(self.paused),
+            'queue_depth': self.send_queue.qsize() if self.send_queue else self.outgoing.qsize(),
+        }
+
+    def control_counters(self, request):
+        counters = {'sent': {}, 'failed': {}}
+        with self.metrics.lock:
+            for (name, labels), value in self.metrics.values.items():
+                if name in ('aprs_packets_sent_total', 'aprs_packets_failed_total'):
+                    kind = 'sent' if name == 'aprs_packets_sent_total' else 'failed'
+                    counters[kind][dict(labels).get('beacon', '')] = value
+        counters['reconnects'] = self.metrics.value('aprs_reconnects_total')
+        return counters
+
+    def control_objects(self, request):
+        return {'objects': [
+            {'name': job.key, 'kind': job.kind, 'interval': job.interval, 'paused': job.key in self.paused}
+            for job in self.jobs.values()
+        ]}
+
+    def control_set_object(self, request):
+        obj = request.get('object')
+        if not isinstance(obj, dict):
+            return {'ok': False, 'error': "set_object needs an 'object' mapping"}
+        problems = validate_beacon(obj)
+        if not problems:
+            name = str(obj['name']).strip()
+            if len(name) > 9:
+                problems.append("name must be at most 9 characters")
+            elif name.upper() == self.beacon_callsign:
+                problems.append("name is the station callsign")
+        if problems:
+            return {'ok': False, 'error': "; ".join(problems)}
+        job = self.object_job(obj)
+        with self.reload_lock:
+            if self.jobs.get(job.key) != job:
+                self.apply_job_changes([job], [])
+        return {'name': job.key}
+
+    def control_remove_object(self, request):
+        name = request.get('name')
+        if not name:
+            return {'ok': False, 'error': "remove_object needs a 'name'"}
+        with self.reload_lock:
+            if name not in self.jobs or self.jobs[name].kind != 'object':
+                return {'ok': False, 'error': f"no such object: {name}"}
+            self.apply_job_changes([], [name])
+        return {'name': name}
+
+    def control_pause(self, request):
+        name = request.get('name')
+        if not name:
+            return {'ok': False, 'error': "pause needs a 'name'"}
+        if name not in self.jobs:
+            return {'ok': False, 'error': f"no such beacon: {name}"}
+        self.paused.add(name)
+        self.emit_event('paused', name=name)
+        return {'paused': sorted(self.paused)}
+
+    def control_resume(self, request):
+        name = request.get('name')
+        if not name:
+            return {'ok': False, 'error': "resume needs a 'name'"}
+        if name not in self.jobs and name not in self.paused:
+            return {'ok': False, 'error': f"no such beacon: {name}"}
+        self.paused.discard(name)
+        self.emit_event('resumed', name=name)
+        return {'paused': sorted(self.paused)}
+
+    def control_reload(self, request):
+        self.reload_requested.set()
+        return {}
+
+    def control_stop(self, request):
+        threading.Thread(target=self.stop, daemon=True).start()
+        return {}
 
     def disconnect_aprs_is(self):
         if self.aprs_socket:
@@ -111,95 +1768,771 @@ class APRSBeacon:
             except:
                 pass
             self.aprs_socket = None
+            self.emit_event('state', connected=False)
 
     def format_coordinate(self, coord, is_longitude=False):
-        degrees = int(abs(coord))
-        minutes = (abs(coord) - degrees) * 60
-        if is_longitude:
-            direction = 'E' if coord >= 0 else 'W'
-            return f"{degrees:03d}{minutes:05.2f}{direction}"
-        else:
-            direction = 'N' if coord >= 0 else 'S'
-            return f"{degrees:02d}{minutes:05.2f}{direction}"
+        return format_coordinate(coord, is_longitude)
 
-    def create_position_packet(self, callsign, lat, lon, symbol_table, symbol, comment):
-        lat_str = self.format_coordinate(lat, False)
-        lon_str = self.format_coordinate(lon, True)
-        return f"{callsign}>APRS,TCPIP*:={lat_str}{symbol_table}{lon_str}{symbol}{comment}"
+    def position_field(self, lat, lon, symbol_table, symbol, coords=None):
+        """Position part of a packet; `coords` may come pre-encoded from the batch encoders."""
+        if self.config.get('compressed', False):
+            compressed = coords or compress_position(lat, lon)
+            return f"{symbol_table}{compressed}{symbol} sT"
+        lat_str, lon_str = coords or (self.format_coordinate(lat, False), self.format_coordinate(lon, True))
+        return f"{lat_str}{symbol_table}{lon_str}{symbol}"
 
-    def create_object_packet(self, callsign, obj_name, lat, lon, symbol_table, symbol, comment):
-        lat_str = self.format_coordinate(lat, False)
-        lon_str = self.format_coordinate(lon, True)
+    def create_position_packet(self, callsign, lat, lon, symbol_table, symbol, comment, coords=None):
+        position = self.position_field(lat, lon, symbol_table, symbol, coords)
+        return f"{callsign}>APRS,TCPIP*:={position}{comment}"
+
+    def create_object_packet(self, callsign, obj_name, lat, lon, symbol_table, symbol, comment, coords=None):
+        position = self.position_field(lat, lon, symbol_table, symbol, coords)
         obj_name_padded = f"{obj_name:<9}"[:9]
-        return f"{callsign}>APRS,TCPIP*:;{obj_name_padded}*111111z{lat_str}{symbol_table}{lon_str}{symbol}{comment}"
+        return f"{callsign}>APRS,TCPIP*:;{obj_name_padded}*111111z{position}{comment}"
+
+    def note_first_packet(self):
+        """Log how long the process took from launch to its first packet (once)."""
+        if self.first_packet is not None:
+            return
+        self.first_packet = time.monotonic() - PROCESS_STARTED
+        self.metrics.set('aprs_startup_seconds', self.first_packet)
+        self.log(f"⏱ First packet {self.first_packet * 1000:.0f} ms after start", startup_ms=round(self.first_packet * 1000))
 
-    def send_packet(self, packet):
+    def send_packet(self, packet, key=''):
+        """Queue a packet (text, or pre-encoded bytes with CRLF) for the writer thread.
+
+        Only the writer touches the socket. `key` names the beacon for metrics.
+        """
         if self.config.get('dry_run', False):
-            self.log(f"🔍 DRY RUN: {packet}")
+            self.log(f"🔍 DRY RUN: {self.packet_text(packet)}")
+            self.note_first_packet()
             return True
 
+        if isinstance(packet, str):
+            packet = (packet + "\r\n").encode('utf-8')
+        self.outgoing.put((key, packet, time.monotonic()))
+        return True
+
+    def packet_writer(self):
+        """Coalesce queued packets into one sendall per flush window and own all reconnects."""
+        window = self.config.get('flush_window', 0.05)
+        while self.running:
+            # While the outbox has a backlog, idle moments are spent replaying it
+            replaying = self.outbox is not None and self.outbox.pending and self.aprs_socket is not None
+            try:
+                batch = [self.outgoing.get(timeout=0.01 if replaying else 1)]
+            except queue.Empty:
+                if not self.config.get('dry_run', False):
+                    self.maintain_connection()
+                if self.outbox is not None:
+                    self.replay_outbox()
+                continue
+
+            limit = MAX_BATCH
+            if self.rate_limiter:
+                limit = min(limit, int(self.rate_limiter.burst))
+
+            deadline = time.monotonic() + window
+            while len(batch) < limit:
+                remaining = deadline - time.monotonic()
+                try:
+                    if remaining > 0:
+                        batch.append(self.outgoing.get(timeout=remaining))
+                    else:
+                        batch.append(self.outgoing.get_nowait())
+                except queue.Empty:
+                    break
+
+            if self.rate_limiter:
+                self.rate_limiter.acquire(len(batch))
+            self.write_batch(batch)
+
+    def record_batch(self, batch, sent):
+        now = time.monotonic()
+        debug = self.logger.enabled('debug')
+        if sent:
+            # Remember what went out so the stream reader can match echoes
+            with self.stream_lock:
+                for key, packet, _ in batch:
+                    if key:
+                        body = packet.split(b":", 1)[-1].rstrip(b"\r\n")
+                        self.sent_index[body] = (key, now)
+                        self.sent_index.move_to_end(body)
+                while len(self.sent_index) > ECHO_INDEX_SIZE:
+                    self.sent_index.popitem(last=False)
+        if sent and self.first_packet is None:
+            self.note_first_packet()
+        if sent and self.outbox is not None and self.outbox.pending:
+            # A replayed older packet would move the object back to a stale position
+            try:
+                self.outbox.discard({key for key, _, _ in batch if key})
+            except sqlite3.Error as e:
+                self.log(f"❌ Outbox update failed: {e}", 'error')
+        for key, packet, queued in batch:
+            if sent:
+                self.metrics.inc('aprs_packets_sent_total', beacon=key)
+                self.metrics.observe('aprs_send_latency_seconds', now - queued)
+                if debug:
+                    self.log(f"📡 Sent: {self.packet_text(packet)}", 'debug', beacon=key)
+            else:
+                self.metrics.inc('aprs_packets_failed_total', beacon=key)
+        if self.subscribers:
+            self.emit_event('sent' if sent else 'failed', count=len(batch),
+                            beacons=[key for key, _, _ in batch[:100]])
+
+    def write_batch(self, batch):
         try:
-            if not self.aprs_socket:
-                if not self.connect_aprs_is():
-                    return False
+            if not self.maintain_connection():
+                self.undelivered(batch, "not connected")
+                return False
 
-            self.aprs_socket.sendall((packet + "\r\n").encode('utf-8'))
-            self.log(f"📡 Sent: {packet}")
+            self.aprs_socket.sendall(b"".join(packet for _, packet, _ in batch))
+            self.record_batch(batch, True)
             return True
         except Exception as e:
-            self.log(f"❌ Send failed: {e}")
+            self.log(f"❌ Send failed: {e}", 'error')
+            self.undelivered(batch, "send failed")
             self.disconnect_aprs_is()
             return False
 
-    def beacon_main_station(self):
-        lat = self.config.get('latitude', 0)
-        lon = self.config.get('longitude', 0)
-        symbol_table = self.config.get('symbol_table', '/')
-        symbol = self.config.get('symbol', 'r')
-        comment = self.config.get('comment', '')
-        interval = self.config.get('interval', 10) * 60
+    def open_outbox(self):
+        options = self.config.get('outbox')
+        if not options or self.config.get('dry_run', False):
+            return None
+        if not isinstance(options, dict):
+            options = {'path': options}
+        try:
+            outbox = Outbox(options['path'], self.login_callsign,
+                            int(options.get('max_packets', 10000)), float(options.get('max_age', 3600)))
+        except (sqlite3.Error, OSError) as e:
+            self.log(f"❌ Outbox {options['path']} unavailable, undelivered packets will be dropped: {e}", 'error')
+            return None
+        if outbox.pending:
+            self.log(f"📦 Outbox has {outbox.pending} packets from a previous run")
+        # Without a global rate_limit, replay still trickles out instead of bursting after an outage
+        rate = float(options.get('replay_rate', OUTBOX_REPLAY_RATE))
+        self.replay_limiter = TokenBucket(rate, max(1, int(rate)))
+        return outbox
+
+    def undelivered(self, batch, reason):
+        """Keep packets that could not be sent in the outbox, or drop them without one."""
+        self.record_batch(batch, False)
+        if self.outbox is None:
+            self.log(f"❌ Dropped {len(batch)} packets: {reason}", 'error')
+            return
+        try:
+            self.outbox.save(batch)
+        except sqlite3.Error as e:
+            self.log(f"❌ Dropped {len(batch)} packets: {reason}; outbox error: {e}", 'error')
+            return
+        self.metrics.inc('aprs_outbox_saved_total', len(batch))
+        self.log(f"📦 Saved {len(batch)} packets to the outbox ({reason}), {self.outbox.pending} waiting", 'warning')
+
+    def close_outbox(self, pending):
+        """Save packets still queued at shutdown so the next run delivers them."""
+        if self.outbox is None:
+            return
+        batch = []
+        while not pending.empty():
+            batch.append(pending.get_nowait())
+        if batch:
+            self.outbox.save(batch)
+            self.log(f"📦 Saved {len(batch)} queued packets to the outbox")
+        self.outbox.close()
+        self.outbox = None
+
+    def outbox_batch(self):
+        """Next replay batch, or None when there is nothing to replay or no session yet."""
+        if not self.outbox.pending or not self.running:
+            return None
+        if self.aprs_socket is None and self.aprs_writer is None:
+            return None
+        limit = min(MAX_BATCH, int(self.replay_bucket().burst))
+        try:
+            return self.outbox.take(limit)
+        except sqlite3.Error as e:
+            self.log(f"❌ Outbox read failed: {e}", 'error')
+            return None
+
+    def replay_bucket(self):
+        """rate_limit when one is set, otherwise the outbox's own replay_rate."""
+        return self.rate_limiter or self.replay_limiter
+
+    def replay_outbox(self):
+        """Re-send packets saved during an outage, oldest first, under the rate limit."""
+        batch = self.outbox_batch()
+        if not batch:
+            return
+        self.replay_bucket().acquire(len(batch))
+        if self.write_batch(batch):
+            self.replayed(batch)
+
+    def replayed(self, batch):
+        self.metrics.inc('aprs_outbox_replayed_total', len(batch))
+        if not self.outbox.pending:
+            self.log("📦 Outbox replayed")
+
+    def job_is_live(self, job):
+        return self.running and self.jobs.get(job.key) is job
+
+    def beacon_job(self, job, delay=0.0):
+        planned = time.monotonic() + delay
+        self.stop_event.wait(delay)
+        while self.job_is_live(job):
+            self.metrics.observe('aprs_scheduler_lag_seconds', time.monotonic() - planned)
+            try:
+                if job.key not in self.paused:
+                    self.send_packet(self.encoded_job_packet(job), job.key)
+                planned = self.next_due(planned, job)
+            except Exception as e:
+                # Log and retry next interval instead of letting the beacon's thread die
+                self.log(f"❌ Error sending {job.key}: {e}", 'error', beacon=job.key)
+                planned = time.monotonic() + job.interval
+            self.stop_event.wait(planned - time.monotonic())
+
+    def object_job(self, obj):
+        """Turn one object record (YAML mapping, CSV row, GeoJSON properties, ...) into a job."""
+        name = str(obj.get('name') or '').strip()
+        if not name:
+            raise ValueError("object has no name")
+        if len(name) > 9:
+            self.log(f"⚠ Object name {name!r} is longer than 9 characters, beaconed as {name[:9]!r}", 'warning')
+        if obj.get('track'):
+            return self.track_job(name, obj)
+        interval = float(obj.get('interval') or 10)
+        if interval <= 0:
+            raise ValueError(f"interval must be positive, got {interval}")
+        return BeaconJob(name, 'object', interval * 60, (
+            name,
+            record_coordinate(obj, 'latitude', 90),
+            record_coordinate(obj, 'longitude', 180),
+            obj.get('symbol_table') or '/',
+            obj.get('symbol') or 'r',
+            obj.get('comment') or '',
+        ))
+
+    def track_job(self, name, obj):
+        """A moving object played back from a GPX or CSV track."""
+        track = obj['track'] if isinstance(obj['track'], dict) else {'path': obj['track']}
+        path = track['path']
+        fmt = track.get('format') or os.path.splitext(path)[1].lstrip('.').lower()
+        self.load_track(path, fmt)
+        smart = smart_beaconing_params(obj.get('smart_beaconing', self.config.get('smart_beaconing')))
+        return BeaconJob(name, 'track', float(obj.get('interval') or 1) * 60, (
+            name,
+            path,
+            fmt,
+            bool(track.get('loop', True)),
+            float(track.get('speed', 1.0)),
+            smart,
+            obj.get('symbol_table') or '/',
+            obj.get('symbol') or '>',
+            obj.get('comment') or '',
+        ))
+
+    def load_track(self, path, fmt):
+        """Parse a track file once; reloads only re-read it when its mtime changes."""
+        mtime = os.stat(path).st_mtime
+        cached = self.tracks.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        reader = TRACK_READERS.get(fmt)
+        if reader is None:
+            raise ValueError(f"unknown track format: {fmt}")
+        track = reader(path)
+        self.tracks[path] = (mtime, track)
+        self.log(f"🗺 Loaded track {path}: {len(track.times)} points, {track.duration / 60:.1f} min")
+        return track
+
+    def track_fix(self, job):
+        """Current playback (track time, lat, lon, course, speed) of a track job."""
+        _, path, _, loop, speed, _, _, _, _ = job.args
+        track = self.tracks[path][1]
+        state = self.track_state.setdefault(job.key, [time.monotonic(), 0.0, 0.0])
+        t = (time.monotonic() - state[0]) * speed
+        t = t % track.duration if loop else min(t, track.duration)
+        lat, lon = track.position(t)
+        course, kmh = track.velocity(track.segment(t))
+        if not loop and t >= track.duration:
+            kmh = 0.0
+        state[1], state[2] = t, course
+        return t, lat, lon, course, kmh
+
+    def iter_objects(self):
+        """Yield object records from the inline beacons list, then every object source."""
+        yield from self.config.get('beacons', None) or []
+        for source in self.config.get('object_sources', None) or []:
+            reader = OBJECT_SOURCES.get(source.get('type'))
+            if reader is None:
+                self.log(f"❌ Unknown object source type: {source.get('type')}", 'error')
+                continue
+            try:
+                yield from reader(source)
+            except Exception as e:
+                self.log(f"❌ Error reading object source {source.get('path')}: {e}", 'error')
+
+    def build_jobs(self):
+        """Describe the main station and every object as schedulable jobs, keyed by name."""
+        jobs = {self.beacon_callsign: BeaconJob(self.beacon_callsign, 'position',
+                                                self.config.get('interval', 10) * 60, (
+            self.config.get('latitude', 0),
+            self.config.get('longitude', 0),
+            self.config.get('symbol_table', '/'),
+            self.config.get('symbol', 'r'),
+            self.config.get('comment', ''),
+        ))}
+        for obj in self.iter_objects():
+            try:
+                job = self.object_job(obj)
+            except Exception as e:
+                self.log(f"❌ Skipping object {obj.get('name')!r}: {e}", 'error')
+                continue
+            if job.key in jobs:
+                self.log(f"⚠ Duplicate object name {job.key!r}, only the last one is beaconed", 'warning')
+            jobs[job.key] = job
+        return jobs
+
+    def phase_offset(self, job):
+        """Deterministic delay before a job's first send when staggered is enabled.
+
+        Objects are spread over their own interval by a hash of their name, so
+        the same config always produces the same send pattern. The main station
+        still beacons immediately.
+        """
+        if not self.config.get('staggered', False) or job.kind == 'position':
+            return 0.0
+        fraction = zlib.crc32(job.key.encode('utf-8')) / 2 ** 32
+        return fraction * job.interval
+
+    def create_job_packet(self, job, coords=None):
+        if job.kind == 'position':
+            return self.create_position_packet(self.beacon_callsign, *job.args, coords=coords)
+        if job.kind == 'track':
+            name, table, symbol, comment = job.args[0], job.args[6], job.args[7], job.args[8]
+            _, lat, lon, course, kmh = self.track_fix(job)
+            if not self.config.get('compressed', False):
+                # APRS course/speed data extension: degrees (360 = north) / knots
+                comment = f"{round(course) or 360:03d}/{min(round(kmh / 1.852), 999):03d}{comment}"
+            return self.create_object_packet(self.beacon_callsign, name, lat, lon, table, symbol, comment)
+        return self.create_object_packet(self.beacon_callsign, *job.args, coords=coords)
+
+    def packet_key(self, job):
+        return (job.kind, self.beacon_callsign, self.config.get('compressed', False), job.args)
+
+    def encoded_job_packet(self, job):
+        """Return the wire bytes (CRLF included) for a job, formatting them only once.
+
+        The cache key is everything the packet depends on, so editing a beacon's
+        config simply misses the cache instead of needing explicit invalidation.
+        """
+        if job.kind == 'track':
+            # Moving objects get a fresh position on every send
+            return (self.create_job_packet(job) + "\r\n").encode('utf-8')
+        key = self.packet_key(job)
+        data = self.packet_cache.get(key)
+        if data is None:
+            data = (self.create_job_packet(job) + "\r\n").encode('utf-8')
+            self.packet_cache[key] = data
+        return data
+
+    def warm_packet_cache(self, jobs):
+        """Pre-encode every uncached packet, formatting all coordinates in one batch."""
+        missing = [job for job in jobs if job.kind != 'track' and self.packet_key(job) not in self.packet_cache]
+        if not missing:
+            return
+
+        offsets = [0 if job.kind == 'position' else 1 for job in missing]
+        lats = [job.args[offset] for job, offset in zip(missing, offsets)]
+        lons = [job.args[offset + 1] for job, offset in zip(missing, offsets)]
+        if self.config.get('compressed', False):
+            coords = encode_compressed(lats, lons)
+        else:
+            coords = list(zip(*encode_coordinates(lats, lons)))
+
+        for job, job_coords in zip(missing, coords):
+            data = (self.create_job_packet(job, job_coords) + "\r\n").encode('utf-8')
+            self.packet_cache[self.packet_key(job)] = data
+
+    def prune_packet_cache(self, jobs):
+        """Drop cached packets for beacons that are no longer configured."""
+        live = {self.packet_key(job) for job in jobs}
+        for key in list(self.packet_cache):
+            if key not in live:
+                del self.packet_cache[key]
+
+    def packet_text(self, packet):
+        if isinstance(packet, bytes):
+            return packet.decode('utf-8').rstrip("\r\n")
+        return packet
+
+    def next_due(self, due, job):
+        """Keep the original cadence, but never try to catch up on missed slots.
+
+        Track jobs with smart_beaconing instead pick their next send from the
+        speed and turns ahead on the track.
+        """
+        now = time.monotonic()
+        if job.kind == 'track' and job.args[5] and job.key in self.track_state:
+            _, path, _, loop, speed, smart, _, _, _ = job.args
+            _, t0, course0 = self.track_state[job.key]
+            interval = (smart_beacon_due(self.tracks[path][1], t0, course0, smart, loop) - t0) / speed
+            return now + max(interval, 1.0)
+        next_due = due + job.interval
+        if next_due <= now:
+            next_due = now + job.interval
+        return next_due
+
+    def schedule_job(self, job, delay=0.0):
+        """Hand a job to the heap scheduler; safe to call from any thread."""
+        with self.schedule_lock:
+            self.pending_jobs.append((time.monotonic() + delay, job))
+        self.wakeup.set()
+
+    def run_scheduler(self):
+        """Single timer loop: a heap of (next_due, seq, job) replaces one thread per beacon.
+
+        Jobs replaced or removed by a reload are dropped lazily when they surface.
+        """
+        heap = []
+        seq = 0
 
         while self.running:
-            packet = self.create_position_packet(self.beacon_callsign, lat, lon, symbol_table, symbol, comment)
-            self.send_packet(packet)
-            time.sleep(interval)
-
-    def beacon_object(self, obj_config):
-        name = obj_config.get('name', '')
-        lat = obj_config.get('latitude', 0)
-        lon = obj_config.get('longitude', 0)
-        symbol_table = obj_config.get('symbol_table', '/')
-        symbol = obj_config.get('symbol', 'r')
-        comment = obj_config.get('comment', '')
-        interval = obj_config.get('interval', 10) * 60
+            self.wakeup.clear()
+            with self.schedule_lock:
+                for due, job in self.pending_jobs:
+                    heapq.heappush(heap, (due, seq, job))
+                    seq += 1
+                self.pending_jobs.clear()
+
+            if heap and not self.job_is_live(heap[0][2]):
+                heapq.heappop(heap)
+                continue
 
+            delay = heap[0][0] - time.monotonic() if heap else None
+            if delay is None or delay > 0:
+                self.wakeup.wait(delay)
+                continue
+
+            due, _, job = heapq.heappop(heap)
+            self.metrics.observe('aprs_scheduler_lag_seconds', time.monotonic() - due)
+            try:
+                if job.key not in self.paused:
+                    self.send_packet(self.encoded_job_packet(job), job.key)
+                next_due = self.next_due(due, job)
+            except Exception as e:
+                # One broken job must not stop the timer loop for every other beacon
+                self.log(f"❌ Error sending {job.key}: {e}", 'error', beacon=job.key)
+                next_due = time.monotonic() + job.interval
+
+            heapq.heappush(heap, (next_due, seq, job))
+            seq += 1
+
+    def activate_jobs(self, jobs, removed=(), fresh=()):
+        """Start (or restart) beacons on whichever engine is running.
+
+        Beacons named in `fresh` (all of them at startup, added ones on a
+        reload) wait for their stagger offset; beacons that were already
+        running send their updated packet right away.
+        """
+        if self.engine == 'asyncio':
+            self.loop.call_soon_threadsafe(self.async_activate_jobs, list(jobs), list(removed), set(fresh))
+            return
+
+        for job in jobs:
+            delay = self.phase_offset(job) if job.key in fresh else 0.0
+            if self.scheduler == 'heap':
+                self.schedule_job(job, delay)
+            else:
+                thread = threading.Thread(target=self.beacon_job, args=(job, delay), daemon=True)
+                thread.start()
+                self.threads.append(thread)
+        self.threads = [thread for thread in self.threads if thread.is_alive()]
+
+    async def async_read_logresp(self, reader):
+        """Read server lines until the logresp line (or EOF) and return them."""
+        lines = []
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            text = line.decode('utf-8', errors='replace').strip()
+            lines.append(text)
+            if text.startswith('#') and 'logresp' in text.lower():
+                break
+        return lines
+
+    async def async_try_server(self, server):
+        """Open a session to one server and log in; return (reader, writer) or None."""
+        host = server['host']
+        port = server['port']
+        started = time.monotonic()
+        writer = None
+        try:
+            self.log(f"🔗 Connecting to APRS-IS server: {host}:{port}")
+            reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), 30)
+            self.log("✅ TCP connection established")
+
+            # No settle delay: the server queues the login behind its banner line
+            login_str = self.login_line()
+            self.log(f"📤 Sending login: {login_str.strip()}")
+            writer.write(login_str.encode('utf-8'))
+            await writer.drain()
+
+            try:
+                response = "\n".join(await asyncio.wait_for(self.async_read_logresp(reader), 5.0))
+            except asyncio.TimeoutError:
+                response = ""
+            self.log("📥 Server response:\n" + response.strip())
+
+            if self.login_verified(response):
+                self.log(f"✅ Logged in as {self.login_callsign} via {host}:{port}")
+                self.record_server_result(server, time.monotonic() - started)
+                return reader, writer
+            self.log(f"❌ Login rejected by {host}:{port}", 'error')
+        except asyncio.CancelledError:
+            # Lost a race: drop the half-open session quietly
+            if writer is not None:
+                writer.close()
+            raise
+        except Exception as e:
+            self.log(f"❌ Connection failed: {e}", 'error')
+        if writer is not None:
+            writer.close()
+        self.record_server_result(server, None)
+        return None
+
+    async def async_race_servers(self):
+        """Log in to every server at once, keep the first verified session and close the rest."""
+        pending = {asyncio.create_task(self.async_try_server(server)) for server in self.aprs_servers}
+        session = None
+        try:
+            while pending and session is None:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    result = task.result()
+                    if result and session is None:
+                        session = result
+                    elif result:
+                        result[1].close()
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        return session
+
+    async def async_connect_aprs_is(self):
+        connect_started = time.monotonic()
+        session = None
+        if self.config.get('server_selection', 'sequential') == 'race' and self.aprs_servers:
+            session = await self.async_race_servers()
+        else:
+            for server in self.ranked_servers():
+                session = await self.async_try_server(server)
+                if session:
+                    break
+
+        if session:
+            self.aprs_reader, self.aprs_writer = session
+            self.failover_seconds = time.monotonic() - connect_started
+            self.log(f"⏱ Connected in {self.failover_seconds:.3f}s")
+            self.connection_established()
+            return True
+
+        self.log("❌ All APRS-IS connection attempts failed", 'error')
+        return False
+
+    def async_disconnect_aprs_is(self):
+        if self.aprs_writer:
+            try:
+                self.aprs_writer.close()
+                self.log("🔌 Disconnected from APRS-IS")
+            except:
+                pass
+            self.aprs_reader = None
+            self.aprs_writer = None
+            self.emit_event('state', connected=False)
+
+    async def async_send_packet(self, packet, key=''):
+        if self.config.get('dry_run', False):
+            self.log(f"🔍 DRY RUN: {self.packet_text(packet)}")
+            self.note_first_packet()
+            return True
+
+        if isinstance(packet, str):
+            packet = (packet + "\r\n").encode('utf-8')
+        await self.send_queue.put((key, packet, time.monotonic()))
+        return True
+
+    async def async_packet_writer(self):
+        """Drain the send queue, writing every ready packet before a single drain()."""
         while self.running:
-            packet = self.create_object_packet(self.beacon_callsign, name, lat, lon, symbol_table, symbol, comment)
-            self.send_packet(packet)
-            time.sleep(interval)
+            limit = MAX_BATCH
+            if self.rate_limiter:
+                limit = min(limit, int(self.rate_limiter.burst))
 
-    def start(self):
-        if not self.connect_aprs_is():
+            replaying = self.outbox is not None and self.outbox.pending and self.aprs_writer is not None
+            try:
+                batch = [await asyncio.wait_for(self.send_queue.get(), 0.01 if replaying else 1)]
+            except asyncio.TimeoutError:
+                if not self.config.get('dry_run', False):
+                    await self.async_maintain_connection()
+                if self.outbox is not None:
+                    await self.async_replay_outbox()
+                continue
+            while len(batch) < limit and not self.send_queue.empty():
+                batch.append(self.send_queue.get_nowait())
+
+            if self.rate_limiter:
+                await asyncio.sleep(self.rate_limiter.reserve(len(batch)))
+            await self.async_write_batch(batch)
+
+    async def async_write_batch(self, batch):
+        try:
+            if not await self.async_maintain_connection():
+                self.undelivered(batch, "not connected")
+                return False
+
+            self.aprs_writer.write(b"".join(packet for _, packet, _ in batch))
+            await self.aprs_writer.drain()
+            self.record_batch(batch, True)
+            return True
+        except Exception as e:
+            self.log(f"❌ Send failed: {e}", 'error')
+            self.undelivered(batch, "send failed")
+            self.async_disconnect_aprs_is()
             return False
 
+    async def async_replay_outbox(self):
+        batch = self.outbox_batch()
+        if not batch:
+            return
+        await asyncio.sleep(self.replay_bucket().reserve(len(batch)))
+        if await self.async_write_batch(batch):
+            self.replayed(batch)
+
+    async def async_beacon(self, job, delay=0.0):
+        planned = time.monotonic() + delay
+        await asyncio.sleep(delay)
+        while self.job_is_live(job):
+            self.metrics.observe('aprs_scheduler_lag_seconds', time.monotonic() - planned)
+            try:
+                if job.key not in self.paused:
+                    await self.async_send_packet(self.encoded_job_packet(job), job.key)
+                planned = self.next_due(planned, job)
+            except Exception as e:
+                # Log and retry next interval instead of letting the beacon's task die
+                self.log(f"❌ Error sending {job.key}: {e}", 'error', beacon=job.key)
+                planned = time.monotonic() + job.interval
+            await asyncio.sleep(planned - time.monotonic())
+
+    def async_activate_jobs(self, jobs, removed, fresh):
+        for key in removed + [job.key for job in jobs]:
+            task = self.job_tasks.pop(key, None)
+            if task:
+                task.cancel()
+        for job in jobs:
+            delay = self.phase_offset(job) if job.key in fresh else 0.0
+            self.job_tasks[job.key] = asyncio.create_task(self.async_beacon(job, delay))
+
+    async def run_async(self):
+        """asyncio engine: one coroutine per beacon and a single writer task."""
+        self.engine = 'asyncio'
+        self.loop = asyncio.get_running_loop()
+        self.async_stop = asyncio.Event()
+        self.send_queue = asyncio.Queue()
+
+        self.outbox = self.open_outbox()
+        if not self.config.get('dry_run', False) and not await self.async_connect_aprs_is():
+            if self.outbox is None:
+                return False
+            self.log("📦 Starting offline, packets are kept in the outbox until APRS-IS is reachable", 'warning')
+            self.back_off()
+
         self.running = True
-        main_thread = threading.Thread(target=self.beacon_main_station, daemon=True)
-        main_thread.start()
-        self.threads.append(main_thread)
+        self.start_metrics_server()
+        self.start_control_server()
+        writer = asyncio.create_task(self.async_packet_writer())
+        self.jobs = self.build_jobs()
+        self.on_air_names = {on_air_name(key): key for key in self.jobs}
+        self.warm_packet_cache(self.jobs.values())
+        self.async_activate_jobs(list(self.jobs.values()), [], set(self.jobs))
+        self.log(f"✅ Started {len(self.job_tasks)} beacon coroutines")
+        if not self.station:
+            watcher = threading.Thread(target=self.config_watcher, daemon=True)
+            watcher.start()
+
+        try:
+            await self.async_stop.wait()
+        finally:
+            tasks = [writer] + list(self.job_tasks.values())
+            if self.reader_task is not None:
+                tasks.append(self.reader_task)
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self.async_disconnect_aprs_is()
+            self.close_outbox(self.send_queue)
+        return True
+
+    def start(self):
+        self.engine = 'threads'
+        self.scheduler = self.config.get('scheduler', 'threads')
+        self.outbox = self.open_outbox()
+        if not self.config.get('dry_run', False) and not self.connect_aprs_is():
+            if self.outbox is None:
+                return False
+            self.log("📦 Starting offline, packets are kept in the outbox until APRS-IS is reachable", 'warning')
+            self.back_off()
+
+        self.running = True
+        self.start_metrics_server()
+        self.start_control_server()
+        self.stop_event.clear()
+        self.writer_thread = threading.Thread(target=self.packet_writer, daemon=True)
+        self.writer_thread.start()
+
+        self.jobs = self.build_jobs()
+        self.on_air_names = {on_air_name(key): key for key in self.jobs}
+        self.prune_packet_cache(self.jobs.values())
+        self.warm_packet_cache(self.jobs.values())
 
-        for obj in self.config.get('beacons', []):
-            thread = threading.Thread(target=self.beacon_object, args=(obj,), daemon=True)
+        if self.scheduler == 'heap':
+            thread = threading.Thread(target=self.run_scheduler, daemon=True)
             thread.start()
             self.threads.append(thread)
+            self.activate_jobs(self.jobs.values(), fresh=self.jobs.keys())
+            self.log(f"✅ Started heap scheduler for {len(self.jobs)} beacons")
+        else:
+            self.activate_jobs(self.jobs.values(), fresh=self.jobs.keys())
+            self.log(f"✅ Started {len(self.threads)} beacon threads")
 
-        self.log(f"✅ Started {len(self.threads)} beacon threads")
+        watcher = threading.Thread(target=self.config_watcher, daemon=True)
+        watcher.start()
+        self.threads.append(watcher)
         return True
 
     def stop(self):
+        # A second signal arriving mid-shutdown must not re-enter the thread joins
+        if self.stopping:
+            return
+        self.stopping = True
         self.running = False
-        self.disconnect_aprs_is()
+        self.stop_event.set()
+        self.wakeup.set()
+        if self.loop and self.async_stop and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self.async_stop.set)
         for thread in self.threads:
             thread.join(timeout=5)
+        if self.writer_thread:
+            self.writer_thread.join(timeout=5)
+        self.disconnect_aprs_is()
+        if self.engine != 'asyncio':
+            # The asyncio engine saves its own queue when run_async unwinds
+            self.close_outbox(self.outgoing)
+        if self.metrics_server:
+            self.metrics_server.shutdown()
+            self.metrics_server = None
+        self.stop_control_server()
         self.log("🛑 Beacon stopped")
 
     def run(self):
@@ -209,7 +2542,21 @@ class APRSBeacon:
         self.log(f"   Latitude: {self.config.get('latitude')}")
         self.log(f"   Longitude: {self.config.get('longitude')}")
         self.log(f"   Dry Run: {self.config.get('dry_run', False)}")
-        self.log(f"   Objects: {len(self.config.get('beacons', []))}")
+        self.log(f"   Engine: {self.config.get('engine', 'threads')}")
+        self.log(f"   Scheduler: {self.config.get('scheduler', 'threads')}")
+        self.log(f"   Staggered: {self.config.get('staggered', False)}")
+        self.log(f"   Objects: {len(self.config.get('beacons', None) or [])}")
+        self.log(f"   Object sources: {len(self.config.get('object_sources', None) or [])}")
+
+        if self.config.get('engine', 'threads') == 'asyncio':
+            try:
+                if not asyncio.run(self.run_async()):
+                    sys.exit(1)
+            except KeyboardInterrupt:
+                self.log("🛑 Keyboard interrupt")
+            finally:
+                self.stop()
+            return
 
         if not self.start():
             sys.exit(1)
@@ -223,6 +2570,221 @@ class APRSBeacon:
             self.stop()
 
 
+# Keys that belong to the whole process rather than to one station profile
+PROCESS_KEYS = ('stations', 'workers', 'worker_mode', 'metrics_port', 'metrics_host', 'control_socket',
+                'log_level', 'log_format', 'log_file')
+# ...plus the ones each profile must set for itself, so top-level values are not inherited
+POOL_KEYS = PROCESS_KEYS + ('beacons', 'object_sources')
+
+
+def station_configs(config):
+    """Merge each `stations` profile over the top-level defaults."""
+    defaults = {key: value for key, value in config.items() if key not in POOL_KEYS}
+    profiles = []
+    for station in config.get('stations') or []:
+        profile = dict(defaults)
+        profile.update(station)
+        if not str(profile.get('callsign', '')).strip():
+            raise ValueError("every station needs a callsign")
+        profile['engine'] = 'asyncio'
+        profiles.append(profile)
+    return profiles
+
+
+def run_station_process(config_file, callsigns):
+    """Worker process entry point: run one shard of stations on a single event loop."""
+    pool = StationPool(APRSBeacon(config_file), callsigns)
+    try:
+        pool.run()
+    finally:
+        # Worker processes exit without running atexit hooks
+        pool.logger.close()
+
+
+class StationMetrics:
+    """The registries of every station in a pool, served as one /metrics page labelled by station."""
+
+    def __init__(self, beacons):
+        self.beacons = beacons
+
+    def render(self):
+        merged = Metrics()
+        for beacon in self.beacons:
+            registry = beacon.metrics
+            for collect in registry.collectors:
+                collect()
+            station = (('station', beacon.station),)
+            with registry.lock:
+                merged.types.update(registry.types)
+                for (name, labels), value in registry.values.items():
+                    merged.values[(name, tuple(sorted(labels + station)))] = value
+                for (name, labels), histogram in registry.histograms.items():
+                    merged.histograms[(name, tuple(sorted(labels + station)))] = list(histogram)
+        return merged.render()
+
+
+class StationPool:
+    """Runs many station profiles in one daemon, each with its own APRS-IS session.
+
+    Stations run on the asyncio engine and are sharded round-robin over a small
+    pool of worker threads, one event loop each, or worker processes that each
+    run their shard the same way.
+    """
+
+    def __init__(self, parent, callsigns=None):
+        self.parent = parent
+        self.config_file = parent.config_file
+        self.config = parent.config
+        self.logger = parent.logger
+        self.callsigns = callsigns
+        self.beacons = []
+        self.workers = []
+        self.processes = []
+        self.running = False
+        self.reload_requested = threading.Event()
+        self.config_mtime = parent.config_mtime
+        self.metrics_server = None
+
+    def log(self, message, level='info'):
+        self.logger.write(level, message, {})
+
+    def profiles(self, config):
+        profiles = station_configs(config)
+        if self.callsigns is not None:
+            profiles = [p for p in profiles if p['callsign'].strip().upper() in self.callsigns]
+        return profiles
+
+    def shards(self, items):
+        workers = max(1, min(int(self.config.get('workers', 4)), len(items)))
+        return [items[i::workers] for i in range(workers)]
+
+    def run_shard(self, beacons):
+        async def main():
+            await asyncio.gather(*(beacon.run_async() for beacon in beacons), return_exceptions=True)
+        asyncio.run(main())
+
+    def start(self):
+        profiles = self.profiles(self.config)
+        if not profiles:
+            self.log("❌ No stations to run", 'error')
+            return False
+
+        self.running = True
+        # Worker processes run their shard with one thread-based worker each
+        if self.callsigns is None and self.config.get('worker_mode', 'threads') == 'processes':
+            for shard in self.shards(profiles):
+                callsigns = [p['callsign'].strip().upper() for p in shard]
+                process = multiprocessing.Process(target=run_station_process,
+                                                  args=(self.config_file, callsigns), daemon=True)
+                process.start()
+                self.processes.append(process)
+            self.log(f"✅ Started {len(profiles)} stations in {len(self.processes)} worker processes")
+            return True
+
+        self.beacons = [APRSBeacon(self.config_file, profile, self.logger) for profile in profiles]
+        for shard in self.shards(self.beacons) if self.callsigns is None else [self.beacons]:
+            worker = threading.Thread(target=self.run_shard, args=(shard,), daemon=True)
+            worker.start()
+            self.workers.append(worker)
+        self.log(f"✅ Started {len(self.beacons)} stations on {len(self.workers)} worker threads")
+        self.start_metrics_server()
+        return True
+
+    def start_metrics_server(self):
+        port = self.config.get('metrics_port')
+        if not port or self.callsigns is not None:
+            return
+        try:
+            self.metrics_server = metrics_server((self.config.get('metrics_host', '127.0.0.1'), port),
+                                                 StationMetrics(self.beacons))
+        except OSError as e:
+            self.log(f"❌ Metrics endpoint failed to start: {e}", 'error')
+            return
+        threading.Thread(target=self.metrics_server.serve_forever, daemon=True).start()
+        self.log(f"📊 Metrics for {len(self.beacons)} stations on "
+                 f"http://{self.metrics_server.server_address[0]}:{port}/metrics")
+
+    def reload(self):
+        """Hand each running station its new profile; adding or removing stations needs a restart."""
+        try:
+            self.config_mtime = os.stat(self.config_file).st_mtime
+            config = load_config_file(self.config_file)
+            profiles = {p['callsign'].strip().upper(): p for p in self.profiles(config)}
+        except Exception as e:
+            self.log(f"❌ Error reloading config, keeping current one: {e}", 'error')
+            return
+        configure_logger(self.logger, config)
+        if set(profiles) != {beacon.station for beacon in self.beacons}:
+            self.log("⚠ Station list changed; restart to add or remove stations", 'warning')
+        for beacon in self.beacons:
+            if beacon.station in profiles:
+                beacon.reload_config(profiles[beacon.station])
+
+    def signal_handler(self, signum, frame):
+        self.log("🛑 Shutdown signal received")
+        self.running = False
+
+    def reload_signal_handler(self, signum, frame):
+        self.log("🔄 Reload signal received")
+        self.reload_requested.set()
+
+    def stop(self):
+        self.running = False
+        if self.metrics_server:
+            self.metrics_server.shutdown()
+            self.metrics_server = None
+        for beacon in self.beacons:
+            beacon.stop()
+        for worker in self.workers:
+            worker.join(timeout=5)
+        for process in self.processes:
+            if process.is_alive():
+                process.terminate()
+        for process in self.processes:
+            process.join(timeout=5)
+        self.log("🛑 All stations stopped")
+
+    def run(self):
+        signal.signal(signal.SIGINT, self.signal_handler)
+        signal.signal(signal.SIGTERM, self.signal_handler)
+        if hasattr(signal, 'SIGHUP'):
+            signal.signal(signal.SIGHUP, self.reload_signal_handler)
+        if self.callsigns is None:
+            self.log(f"🚀 Starting {len(self.config.get('stations'))} stations, "
+                     f"worker mode: {self.config.get('worker_mode', 'threads')}")
+        if not self.start():
+            sys.exit(1)
+
+        try:
+            while self.running:
+                if self.reload_requested.wait(1.0):
+                    self.reload_requested.clear()
+                    if self.processes:
+                        for process in self.processes:
+                            os.kill(process.pid, signal.SIGHUP)
+                    else:
+                        self.reload()
+                    continue
+                if self.processes:
+                    # Worker processes watch the config file themselves
+                    continue
+                if not self.config.get('watch_config', True):
+                    continue
+                try:
+                    mtime = os.stat(self.config_file).st_mtime
+                except OSError:
+                    continue
+                if mtime != self.config_mtime:
+                    self.reload()
+        except KeyboardInterrupt:
+            self.log("🛑 Keyboard interrupt")
+        finally:
+            self.stop()
+
+
 if __name__ == "__main__":
     beacon = APRSBeacon()
-    beacon.run()
+    if beacon.config.get('stations'):
+        StationPool(beacon).run()
+    else:
+        beacon.run()
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Benchmark the beacon daemon against a local fake APRS-IS server
+
+Each object count runs in a fresh process so memory and thread numbers
+are not polluted by earlier runs. Results are written as JSON so runs of
+different versions can be compared.
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import platform
+import tempfile
+import threading
+import subprocess
+import contextlib
+import signal
+import importlib.util
+import multiprocessing
+
+import yaml
+
+from fake_aprs_is import FakeAPRSIS
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def load_beacon_module():
+    spec = importlib.util.spec_from_file_location("aprs_beacon", os.path.join(HERE, "9m2pju-aprs-beacon.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def serve(conn, options):
+    """Fake server process: answers 'stats', 'timing', 'drop', 'silence' and 'stop' commands over a pipe."""
+    async def main():
+        server = await FakeAPRSIS(port=0, **options).start()
+        conn.send(server.port)
+        loop = asyncio.get_running_loop()
+        while True:
+            command = await loop.run_in_executor(None, conn.recv)
+            if command == "stats":
+                conn.send((server.logins, len(server.packets)))
+            elif command == "timing":
+                conn.send((server.first_packet_at, server.last_packet_at))
+            elif command == "drop":
+                server.drop_clients()
+                conn.send(None)
+            elif command == "silence":
+                server.silence_clients()
+                conn.send(None)
+            elif command == "stop":
+                break
+        await server.close()
+
+    asyncio.run(main())
+
+
+class ServerProcess:
+    def __init__(self, options):
+        self.conn, child = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=serve, args=(child, options), daemon=True)
+        self.process.start()
+        self.port = self.conn.recv()
+
+    def call(self, command):
+        self.conn.send(command)
+        return self.conn.recv() if command != "stop" else None
+
+    def stats(self):
+        return self.call("stats")
+
+    def stop(self):
+        self.call("stop")
+        self.process.join(timeout=5)
+
+
+def current_rss_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def cpu_seconds():
+    times = os.times()
+    return times.user + times.system
+
+
+def synthetic_config(objects, port, options):
+    config = {
+        "callsign": "N0CALL",
+        "passcode": "-1",
+        "latitude": 3.0738,
+        "longitude": 101.4457,
+        "comment": "benchmark",
+        "interval": 60,
+        "dry_run": False,
+        "staggered": False,
+        "engine": options["engine"],
+        "scheduler": options["scheduler"],
+        "watch_config": False,
+        "heartbeat_timeout": options["heartbeat_timeout"],
+        "log_level": "warning",
+        "aprs_servers": [{"host": "127.0.0.1", "port": port}],
+        "beacons": [],
+    }
+    for i in range(objects):
+        config["beacons"].append({
+            "name": f"OBJ{i}",
+            "latitude": -80 + (i * 0.0013) % 160,
+            "longitude": -170 + (i * 0.0029) % 340,
+            "symbol_table": "/",
+            "symbol": "r",
+            "comment": "synthetic object",
+            "interval": 60,
+        })
+    return config
+
+
+def wait_for(predicate, timeout, poll=0.01):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(poll)
+    return False
+
+
+def inject(beacon, packet):
+    """Queue a raw packet on whichever engine is running."""
+    if beacon.config.get("engine") == "asyncio":
+        asyncio.run_coroutine_threadsafe(beacon.async_send_packet(packet), beacon.loop)
+    else:
+        beacon.send_packet(packet)
+
+
+def run_case(objects, options, result_conn):
+    module = load_beacon_module()
+    server = ServerProcess(options["server"])
+    expected = objects + 1
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config_file = os.path.join(tmp, "config.yaml")
+        with open(config_file, "w") as f:
+            yaml.safe_dump(synthetic_config(objects, server.port, options), f)
+
+        rss_before = current_rss_mb()
+        cpu_before = cpu_seconds()
+        with open(os.devnull, "w") as log, contextlib.redirect_stdout(log):
+            beacon = module.APRSBeacon(config_file)
+            if options["engine"] == "asyncio":
+                loop_thread = threading.Thread(target=lambda: asyncio.run(beacon.run_async()), daemon=True)
+                loop_thread.start()
+                wait_for(lambda: beacon.running, options["timeout"])
+            else:
+                beacon.start()
+            # The beacon's own connect-to-logresp time, without job building or cache warming
+            login_latency = beacon.failover_seconds
+
+            delivered = wait_for(lambda: server.stats()[1] >= expected, options["timeout"])
+            packets = server.stats()[1]
+            # Throughput from the first to the last packet the server received
+            first, last = server.call("timing")
+            send_seconds = last - first if first is not None else 0.0
+            threads = threading.active_count()
+            rss_after = current_rss_mb()
+
+            def recovery(command):
+                """Break the session with `command`, then probe until a packet arrives over a new login."""
+                logins_before, packets_before = server.stats()
+                broken = time.monotonic()
+                server.call(command)
+
+                def reconnected():
+                    inject(beacon, "N0CALL>APRS,TCPIP*:>benchmark probe")
+                    logins, received = server.stats()
+                    return logins > logins_before and received > packets_before
+
+                return time.monotonic() - broken if wait_for(reconnected, options["timeout"], 0.05) else None
+
+            # A closed session, then one where the server silently stops responding
+            reconnect = recovery("drop")
+            silent_recovery = recovery("silence")
+            beacon.stop()
+            if options["engine"] == "asyncio":
+                loop_thread.join(timeout=5)
+
+        cpu = cpu_seconds() - cpu_before
+
+    server.stop()
+    result_conn.send({
+        "objects": objects,
+        "delivered": delivered,
+        "packets": packets,
+        "login_latency_s": round(login_latency, 4) if login_latency is not None else None,
+        "send_seconds": round(send_seconds, 4),
+        "packets_per_sec": round((packets - 1) / send_seconds, 1) if send_seconds > 0 else None,
+        "reconnect_s": round(reconnect, 4) if reconnect is not None else None,
+        "silent_recovery_s": round(silent_recovery, 4) if silent_recovery is not None else None,
+        "cpu_s": round(cpu, 3),
+        "rss_mb": round(rss_after, 1),
+        "rss_growth_mb": round(rss_after - rss_before, 1),
+        "threads": threads,
+    })
+
+
+def startup_time(config_dir, timeout):
+    """Seconds from launching the daemon to its first dry-run packet."""
+    started = time.monotonic()
+    process = subprocess.Popen([sys.executable, os.path.join(HERE, "9m2pju-aprs-beacon.py")], cwd=config_dir,
+                               stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    elapsed = None
+    deadline = started + timeout
+    for line in process.stdout:
+        if "DRY RUN" in line:
+            elapsed = time.monotonic() - started
+            break
+        if time.monotonic() > deadline:
+            break
+    process.send_signal(signal.SIGINT)
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+    return elapsed
+
+
+def measure_startup(objects, options, runs):
+    """Cold start (YAML parsed and validated) against a start from the config snapshot."""
+    config = synthetic_config(objects, 0, options)
+    config.update({"dry_run": True, "log_level": "info"})
+    result = {"objects": objects}
+    with tempfile.TemporaryDirectory() as tmp:
+        with open(os.path.join(tmp, "config.yaml"), "w") as f:
+            yaml.safe_dump(config, f)
+        for name, keep_snapshot in (("cold", False), ("snapshot", True)):
+            samples = []
+            for _ in range(runs):
+                snapshot = os.path.join(tmp, "config.yaml.snapshot")
+                if not keep_snapshot and os.path.exists(snapshot):
+                    os.remove(snapshot)
+                elapsed = startup_time(tmp, options["timeout"])
+                if elapsed is not None:
+                    samples.append(elapsed)
+            result[f"startup_{name}_ms"] = round(min(samples) * 1000, 1) if samples else None
+    return result
+
+
+def git_version():
+    try:
+        return subprocess.run(["git", "describe", "--always", "--dirty"], cwd=HERE,
+                              capture_output=True, text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the APRS beacon against a fake APRS-IS server")
+    parser.add_argument("--objects", default="10,100,1000,10000,100000",
+                        help="comma-separated object counts")
+    parser.add_argument("--engine", choices=["threads", "asyncio"], default="threads")
+    parser.add_argument("--scheduler", choices=["heap", "threads"], default="heap")
+    parser.add_argument("--login-delay", type=float, default=0.0, help="fake server logresp latency")
+    parser.add_argument("--accept-delay", type=float, default=0.0, help="fake server banner latency")
+    parser.add_argument("--drop-after", type=int, default=0, help="fake server drops clients after N packets")
+    parser.add_argument("--throttle", type=float, default=0.0, help="fake server max packets/s per client")
+    parser.add_argument("--keepalive", type=float, default=1.0, help="fake server # comment interval")
+    parser.add_argument("--heartbeat-timeout", type=float, default=5.0,
+                        help="beacon heartbeat_timeout for the silent-drop test")
+    parser.add_argument("--timeout", type=float, default=120.0, help="seconds to wait for each phase")
+    parser.add_argument("--startup-runs", type=int, default=3,
+                        help="dry-run launches per startup measurement, 0 to skip")
+    parser.add_argument("--output", default="benchmark-results.json")
+    args = parser.parse_args()
+
+    options = {
+        "engine": args.engine,
+        "scheduler": args.scheduler,
+        "timeout": args.timeout,
+        "heartbeat_timeout": args.heartbeat_timeout,
+        "server": {
+            "login_delay": args.login_delay,
+            "accept_delay": args.accept_delay,
+            "drop_after": args.drop_after,
+            "throttle": args.throttle,
+            "keepalive": args.keepalive,
+        },
+    }
+
+    results = []
+    for objects in [int(n) for n in args.objects.split(",") if n.strip()]:
+        receiver, sender = multiprocessing.Pipe(duplex=False)
+        process = multiprocessing.Process(target=run_case, args=(objects, options, sender))
+        process.start()
+        result = receiver.recv() if receiver.poll(args.timeout * 4) else {"objects": objects, "error": "timeout"}
+        process.join(timeout=10)
+        if process.is_alive():
+            process.terminate()
+        results.append(result)
+        print(json.dumps(result), flush=True)
+
+    startup = []
+    if args.startup_runs > 0:
+        for objects in [int(n) for n in args.objects.split(",") if n.strip()]:
+            # Only the small counts say anything about launch cost; large ones measure the YAML size
+            if objects <= 1000:
+                startup.append(measure_startup(objects, options, args.startup_runs))
+                print(json.dumps(startup[-1]), flush=True)
+
+    report = {
+        "version": git_version(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "options": options,
+        "results": results,
+        "startup": startup,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
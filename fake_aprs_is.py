@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Local fake APRS-IS server for testing the beacon without touching the real network
+"""
+
+import time
+import asyncio
+import argparse
+
+
+class FakeAPRSIS:
+    def __init__(self, host="127.0.0.1", port=14580, login_delay=0.0, verified=True,
+                 accept_delay=0.0, drop_after=0, throttle=0.0, echo_delay=None, keepalive=0.0,
+                 silent_after=0.0):
+        self.host = host
+        self.port = port
+        self.login_delay = login_delay
+        self.verified = verified
+        self.accept_delay = accept_delay
+        self.drop_after = drop_after
+        self.throttle = throttle
+        self.echo_delay = echo_delay
+        self.keepalive = keepalive
+        self.silent_after = silent_after
+        self.server = None
+        self.clients = set()
+        self.silent = set()
+        self.logins = 0
+        self.filters = []
+        self.packets = []
+        # Arrival times of the first and latest packet, for throughput measurements
+        self.first_packet_at = None
+        self.last_packet_at = None
+
+    def drop_clients(self):
+        """Close every client connection, as a server restart would."""
+        for writer in list(self.clients):
+            writer.close()
+
+    def silence_clients(self):
+        """Stop talking to and listening to every client without closing, like a dead network path."""
+        self.silent.update(self.clients)
+
+    def go_silent(self, writer):
+        if writer in self.clients:
+            self.silent.add(writer)
+
+    def broadcast(self, line):
+        """Send a line (a packet or a # comment) to every connected client."""
+        for writer in list(self.clients - self.silent):
+            writer.write((line + "\r\n").encode('utf-8'))
+
+    def echo(self, packet):
+        """Send a received packet back out with a q construct, like the APRS-IS core would."""
+        header, sep, info = packet.partition(':')
+        if sep:
+            self.broadcast(f"{header},qAC,FAKE:{info}")
+
+    async def send_keepalives(self):
+        while True:
+            await asyncio.sleep(self.keepalive)
+            self.broadcast("# aprsc 2.1.0 keepalive")
+
+    async def handle_client(self, reader, writer):
+        self.clients.add(writer)
+        await asyncio.sleep(self.accept_delay)
+        writer.write(b"# aprsc 2.1.0 fake-aprs-is\r\n")
+        await writer.drain()
+        received = 0
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                text = line.decode('utf-8', errors='replace').strip()
+                if text.startswith("user "):
+                    self.logins += 1
+                    await asyncio.sleep(self.login_delay)
+                    callsign = text.split()[1]
+                    if " filter " in text:
+                        self.filters.append(text.split(" filter ", 1)[1])
+                    status = "verified" if self.verified else "unverified"
+                    writer.write(f"# logresp {callsign} {status}, server FAKE\r\n".encode('utf-8'))
+                    await writer.drain()
+                    if self.silent_after:
+                        asyncio.get_running_loop().call_later(self.silent_after, self.go_silent, writer)
+                elif writer in self.silent:
+                    continue
+                elif text:
+                    self.packets.append(text)
+                    self.last_packet_at = time.monotonic()
+                    if self.first_packet_at is None:
+                        self.first_packet_at = self.last_packet_at
+                    received += 1
+                    if self.echo_delay is not None:
+                        asyncio.get_running_loop().call_later(self.echo_delay, self.echo, text)
+                    if self.drop_after and received >= self.drop_after:
+                        break
+                    if self.throttle:
+                        await asyncio.sleep(1.0 / self.throttle)
+        except ConnectionError:
+            pass
+        finally:
+            self.clients.discard(writer)
+            self.silent.discard(writer)
+            writer.close()
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle_client, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        if self.keepalive:
+            asyncio.create_task(self.send_keepalives())
+        return self
+
+    async def close(self):
+        if self.server:
+            self.server.close()
+            self.drop_clients()
+            while self.clients:
+                await asyncio.sleep(0.01)
+            await self.server.wait_closed()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Fake APRS-IS server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=14580)
+    parser.add_argument("--login-delay", type=float, default=0.0, help="seconds before logresp")
+    parser.add_argument("--unverified", action="store_true", help="reject every login")
+    parser.add_argument("--accept-delay", type=float, default=0.0, help="seconds before the banner")
+    parser.add_argument("--drop-after", type=int, default=0, help="close a client after N packets")
+    parser.add_argument("--throttle", type=float, default=0.0, help="max packets/s read per client")
+    parser.add_argument("--echo-delay", type=float, default=None, help="echo packets back after N seconds")
+    parser.add_argument("--keepalive", type=float, default=0.0, help="send a # comment every N seconds")
+    parser.add_argument("--silent-after", type=float, default=0.0,
+                        help="go silent on a client N seconds after login without closing it")
+    args = parser.parse_args()
+
+    server = await FakeAPRSIS(args.host, args.port, args.login_delay, not args.unverified,
+                              args.accept_delay, args.drop_after, args.throttle,
+                              args.echo_delay, args.keepalive, args.silent_after).start()
+    print(f"Fake APRS-IS listening on {server.host}:{server.port}", flush=True)
+    while True:
+        count = len(server.packets)
+        await asyncio.sleep(1)
+        if len(server.packets) != count:
+            print(f"logins={server.logins} packets={len(server.packets)}", flush=True)
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
@@ -1,29 +1,181 @@
-import sys, yaml, subprocess, threading, time
+import sys, os, re, copy, json, yaml, socket, subprocess, threading, time
+from collections import deque
 from PyQt6.QtWidgets import *
-from PyQt6.QtCore import Qt, QTimer, pyqtSignal, QObject
-from PyQt6.QtGui import QTextCursor
+from PyQt6.QtCore import Qt, QTimer, QObject, QAbstractListModel, QModelIndex, QSortFilterProxyModel
 from datetime import datetime
 
+MAX_LOG_LINES = 20000
+LOG_LEVELS = {"DEBUG": 10, "INFO": 20, "WARNING": 30, "ERROR": 40}
+LEVEL_PREFIX = re.compile(r"^(\[[^\]]*\] )\[(DEBUG|WARNING|ERROR)\] ")
+DEFAULT_CONTROL_SOCKET = "aprs-beacon.sock"
+
+
+def parse_log_line(line):
+    """Return (level, display text) for a daemon log line in text or JSON format."""
+    if line.startswith("{"):
+        try:
+            entry = json.loads(line)
+            level = str(entry.get("level", "info")).upper()
+            return level, f"[{entry.get('time', '')}] {entry.get('message', '')}"
+        except ValueError:
+            pass
+    match = LEVEL_PREFIX.match(line)
+    if match:
+        return match.group(2), match.group(1) + line[match.end():]
+    return "INFO", line
+
 
 class ProcessMonitor(QObject):
-    output_received = pyqtSignal(str)
+    """Reads the daemon's stdout on a thread; the GUI collects lines in batches with take_lines()."""
 
     def __init__(self, process):
         super().__init__()
         self.process = process
         self.running = True
+        self.lines = deque(maxlen=MAX_LOG_LINES)
+        self.lock = threading.Lock()
 
     def monitor(self):
         while self.running and self.process.poll() is None:
             try:
                 line = self.process.stdout.readline()
                 if line:
-                    self.output_received.emit(line.strip())
+                    with self.lock:
+                        self.lines.append(line.strip())
                 else:
                     time.sleep(0.1)
             except:
                 break
 
+    def take_lines(self):
+        with self.lock:
+            lines = list(self.lines)
+            self.lines.clear()
+        return lines
+
+
+class ControlClient:
+    """Line-delimited JSON requests to the daemon's control socket."""
+
+    def __init__(self, path, timeout=0.5):
+        self.path = path
+        self.timeout = timeout
+
+    def available(self):
+        return bool(self.path) and hasattr(socket, "AF_UNIX") and os.path.exists(self.path)
+
+    def call(self, cmd, **args):
+        """Return the daemon's response, or None if no daemon is answering."""
+        if not self.available():
+            return None
+        args["cmd"] = cmd
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.settimeout(self.timeout)
+                sock.connect(self.path)
+                sock.sendall((json.dumps(args) + "\n").encode("utf-8"))
+                with sock.makefile("r", encoding="utf-8") as f:
+                    return json.loads(f.readline())
+        except (OSError, ValueError):
+            return None
+
+
+class EventMonitor:
+    """Streams log events from a daemon the GUI did not start, collected like ProcessMonitor lines."""
+
+    def __init__(self, client):
+        self.client = client
+        self.running = True
+        self.lines = deque(maxlen=MAX_LOG_LINES)
+        self.lock = threading.Lock()
+
+    def monitor(self):
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.connect(self.client.path)
+                sock.sendall(b'{"cmd": "subscribe"}\n')
+                sock.settimeout(1.0)
+                with sock.makefile("r", encoding="utf-8") as f:
+                    while self.running:
+                        try:
+                            line = f.readline()
+                        except socket.timeout:
+                            continue
+                        if not line:
+                            break
+                        event = json.loads(line)
+                        if event.get("event") == "log":
+                            # Events carry an epoch float; show it like the daemon's text log lines
+                            if isinstance(event.get("time"), (int, float)):
+                                event["time"] = datetime.fromtimestamp(event["time"]).strftime("%Y-%m-%d %H:%M:%S")
+                            with self.lock:
+                                self.lines.append(json.dumps(event))
+        except (OSError, ValueError):
+            pass
+
+    def take_lines(self):
+        with self.lock:
+            lines = list(self.lines)
+            self.lines.clear()
+        return lines
+
+
+class LogModel(QAbstractListModel):
+    """Ring buffer of the most recent log lines, exposed to a virtualized list view."""
+
+    def __init__(self, max_lines=MAX_LOG_LINES):
+        super().__init__()
+        self.entries = deque()
+        self.max_lines = max_lines
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.entries)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and index.isValid():
+            return self.entries[index.row()][1]
+        return None
+
+    def append_lines(self, entries):
+        entries = entries[-self.max_lines:]
+        if not entries:
+            return
+        overflow = len(self.entries) + len(entries) - self.max_lines
+        if overflow > 0:
+            self.beginRemoveRows(QModelIndex(), 0, overflow - 1)
+            for _ in range(overflow):
+                self.entries.popleft()
+            self.endRemoveRows()
+        start = len(self.entries)
+        self.beginInsertRows(QModelIndex(), start, start + len(entries) - 1)
+        self.entries.extend(entries)
+        self.endInsertRows()
+
+    def clear(self):
+        self.beginResetModel()
+        self.entries.clear()
+        self.endResetModel()
+
+
+class LogFilterProxy(QSortFilterProxyModel):
+    """Filters log lines by minimum level and a case-insensitive text (e.g. callsign) match."""
+
+    def __init__(self):
+        super().__init__()
+        self.min_level = 0
+        self.text = ""
+
+    def set_filter(self, min_level, text):
+        self.min_level = min_level
+        self.text = text.strip().upper()
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        level, line = self.sourceModel().entries[source_row]
+        if LOG_LEVELS.get(level, 20) < self.min_level:
+            return False
+        return not self.text or self.text in line.upper()
+
 
 class APRSGui(QMainWindow):
     def __init__(self):
@@ -31,9 +183,12 @@ class APRSGui(QMainWindow):
         self.setWindowTitle("9M2PJU Easy APRS Beacon and Object")
         self.setGeometry(200, 200, 1000, 700)
         self.config = {}
+        # What config.yaml holds on disk, so unchanged settings are not rewritten
+        self.saved_config = None
         self.aprs_process = None
         self.process_monitor = None
         self.monitor_thread = None
+        self.control = ControlClient(DEFAULT_CONTROL_SOCKET)
 
         self.init_ui()
         self.load_config()
@@ -82,6 +237,8 @@ class APRSGui(QMainWindow):
         save_btn = QPushButton("💾 Save Config")
         self.start_btn = QPushButton("▶ Start")
         self.stop_btn = QPushButton("⏹ Stop")
+        self.pause_btn = QPushButton("⏯ Pause/Resume Selected")
+        self.pause_btn.setEnabled(False)
         clear_log_btn = QPushButton("🗑 Clear Log")
 
         self.start_btn.setStyleSheet("QPushButton { background-color: #4CAF50; color: white; font-weight: bold; }")
@@ -93,6 +250,7 @@ class APRSGui(QMainWindow):
         save_btn.clicked.connect(self.save_config)
         self.start_btn.clicked.connect(self.start_beaconing)
         self.stop_btn.clicked.connect(self.stop_beaconing)
+        self.pause_btn.clicked.connect(self.toggle_selected_pause)
         clear_log_btn.clicked.connect(self.clear_log)
 
         btn_layout = QHBoxLayout()
@@ -102,18 +260,40 @@ class APRSGui(QMainWindow):
         btn_layout.addWidget(save_btn)
         btn_layout.addWidget(self.start_btn)
         btn_layout.addWidget(self.stop_btn)
+        btn_layout.addWidget(self.pause_btn)
         btn_layout.addWidget(clear_log_btn)
 
-        self.log_box = QTextEdit()
-        self.log_box.setReadOnly(True)
-        self.log_box.setMaximumHeight(200)
+        self.log_model = LogModel()
+        self.log_filter = LogFilterProxy()
+        self.log_filter.setSourceModel(self.log_model)
+        self.log_view = QListView()
+        self.log_view.setModel(self.log_filter)
+        self.log_view.setUniformItemSizes(True)
+        self.log_view.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.log_view.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.log_view.setMaximumHeight(200)
+
+        self.log_level_combo = QComboBox()
+        self.log_level_combo.addItems(["All", "Info", "Warning", "Error"])
+        self.log_level_combo.setCurrentText("All")
+        self.log_search_input = QLineEdit()
+        self.log_search_input.setPlaceholderText("Filter by callsign or text")
+        self.log_level_combo.currentTextChanged.connect(self.update_log_filter)
+        self.log_search_input.textChanged.connect(self.update_log_filter)
+
+        log_filter_layout = QHBoxLayout()
+        log_filter_layout.addWidget(QLabel("Beacon Process Log:"))
+        log_filter_layout.addStretch()
+        log_filter_layout.addWidget(QLabel("Level:"))
+        log_filter_layout.addWidget(self.log_level_combo)
+        log_filter_layout.addWidget(self.log_search_input)
 
         main_layout.addLayout(form_layout)
         main_layout.addWidget(QLabel("Object Beacons:"))
         main_layout.addWidget(self.table)
         main_layout.addLayout(btn_layout)
-        main_layout.addWidget(QLabel("Beacon Process Log:"))
-        main_layout.addWidget(self.log_box)
+        main_layout.addLayout(log_filter_layout)
+        main_layout.addWidget(self.log_view)
 
         central_widget = QWidget()
         central_widget.setLayout(main_layout)
@@ -123,15 +303,33 @@ class APRSGui(QMainWindow):
         self.status_timer.timeout.connect(self.check_process_status)
         self.status_timer.start(1000)
 
+        # Daemon output is collected off-thread and appended in one batch per tick
+        self.log_timer = QTimer()
+        self.log_timer.timeout.connect(self.flush_process_output)
+        self.log_timer.start(100)
+
+    def append_log_entries(self, entries):
+        scrollbar = self.log_view.verticalScrollBar()
+        at_bottom = scrollbar.value() >= scrollbar.maximum()
+        self.log_model.append_lines(entries)
+        if at_bottom:
+            self.log_view.scrollToBottom()
+
     def log(self, msg):
-        self.log_box.append(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] {msg}")
-        cursor = self.log_box.textCursor()
-        cursor.movePosition(QTextCursor.MoveOperation.End)
-        self.log_box.setTextCursor(cursor)
-        self.log_box.ensureCursorVisible()
+        self.append_log_entries([("INFO", f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] {msg}")])
+
+    def flush_process_output(self):
+        if self.process_monitor:
+            lines = self.process_monitor.take_lines()
+            if lines:
+                self.append_log_entries([parse_log_line(line) for line in lines])
+
+    def update_log_filter(self):
+        min_level = LOG_LEVELS.get(self.log_level_combo.currentText().upper(), 0)
+        self.log_filter.set_filter(min_level, self.log_search_input.text())
 
     def clear_log(self):
-        self.log_box.clear()
+        self.log_model.clear()
         self.log("Log cleared")
 
     def show_error(self, title, message):
@@ -158,6 +356,8 @@ class APRSGui(QMainWindow):
         except Exception as e:
             self.log(f"No existing config found: {e}")
             return
+        self.saved_config = copy.deepcopy(self.config)
+        self.control.path = self.config.get("control_socket", DEFAULT_CONTROL_SOCKET)
 
         self.callsign_input.setText(self.config.get("callsign", ""))
         self.passcode_input.setText(str(self.config.get("passcode", "")))
@@ -203,6 +403,9 @@ class APRSGui(QMainWindow):
                 name = self.table.item(row, 0).text() if self.table.item(row, 0) else ""
                 if not name:
                     continue
+                if len(name) > 9:
+                    self.show_error("Validation Error", f"Object name in row {row + 1} is longer than 9 characters")
+                    return
                 beacons.append({
                     "name": name,
                     "latitude": float(self.table.item(row, 1).text()),
@@ -216,7 +419,9 @@ class APRSGui(QMainWindow):
                 self.show_error("Validation Error", f"Error in row {row + 1}: {e}")
                 return
 
-        self.config = {
+        # Keep daemon-only options (scheduler, servers, ...) that the form doesn't edit
+        self.config = dict(self.config or {})
+        self.config.update({
             "callsign": self.callsign_input.text().strip().upper(),
             "passcode": self.passcode_input.text().strip(),
             "latitude": float(self.lat_input.text()) if self.lat_input.text() else 0,
@@ -228,22 +433,47 @@ class APRSGui(QMainWindow):
             "dry_run": self.dry_run_check.isChecked(),
             "staggered": self.staggered_check.isChecked(),
             "beacons": beacons,
-            "aprs_servers": [
-                {"host": "aprs.hamradio.my", "port": 14580},
-                {"host": "rotate.aprs.net", "port": 14580}
-            ]
-        }
+        })
+        # Multi-station daemons have no control socket, and refuse a config that sets one
+        if "stations" not in self.config:
+            self.config.setdefault("control_socket", DEFAULT_CONTROL_SOCKET)
+        self.control.path = self.config.get("control_socket", DEFAULT_CONTROL_SOCKET)
+        self.config.setdefault("aprs_servers", [
+            {"host": "aprs.hamradio.my", "port": 14580},
+            {"host": "rotate.aprs.net", "port": 14580}
+        ])
+
+        # Rewriting an identical file would only cost the beacon a reload and a config snapshot rebuild
+        if self.config == self.saved_config and os.path.exists("config.yaml"):
+            self.log("✅ Configuration unchanged")
+            return True
 
         try:
-            with open("config.yaml", "w") as f:
+            # Write-then-rename so a running beacon never reloads a half-written file
+            with open("config.yaml.tmp", "w") as f:
                 yaml.safe_dump(self.config, f, default_flow_style=False)
+            os.replace("config.yaml.tmp", "config.yaml")
+            self.saved_config = copy.deepcopy(self.config)
             self.log("✅ Configuration saved successfully")
+            if self.control.call("reload"):
+                self.log("🔄 Running beacon is reloading the new configuration")
+            return True
         except Exception as e:
             self.show_error("Save Error", f"Failed to save config: {e}")
 
     def start_beaconing(self):
+        # A daemon that is already up (ours or one started elsewhere) is reconfigured, not respawned
+        if not self.save_config():
+            return
+        if self.control.call("ping"):
+            if not self.aprs_process and not self.process_monitor:
+                self.log("🔗 Attached to running beacon")
+                self.process_monitor = EventMonitor(self.control)
+                self.monitor_thread = threading.Thread(target=self.process_monitor.monitor, daemon=True)
+                self.monitor_thread.start()
+                self.set_running_ui()
+            return
         try:
-            self.save_config()
             self.aprs_process = subprocess.Popen(
                 [sys.executable, "9m2pju-aprs-beacon.py"],
                 stdout=subprocess.PIPE,
@@ -251,36 +481,84 @@ class APRSGui(QMainWindow):
                 text=True,
                 bufsize=1
             )
+            # stdout is still drained so the pipe never blocks the daemon; status comes from the control socket
             self.process_monitor = ProcessMonitor(self.aprs_process)
-            self.process_monitor.output_received.connect(self.log)
             self.monitor_thread = threading.Thread(target=self.process_monitor.monitor, daemon=True)
             self.monitor_thread.start()
-            self.start_btn.setEnabled(False)
-            self.stop_btn.setEnabled(True)
-            self.status_label.setText("Status: Running")
-            self.status_label.setStyleSheet("QLabel { background-color: #4CAF50; color: white; padding: 5px; border: 1px solid #ccc; }")
+            self.set_running_ui()
         except Exception as e:
             self.show_error("Start Error", f"Failed to start beacon: {e}")
 
+    def set_running_ui(self):
+        self.start_btn.setText("🔄 Apply")
+        self.stop_btn.setEnabled(True)
+        self.pause_btn.setEnabled(True)
+        self.status_label.setText("Status: Running")
+        self.status_label.setStyleSheet("QLabel { background-color: #4CAF50; color: white; padding: 5px; border: 1px solid #ccc; }")
+
     def stop_beaconing(self):
+        stopped = self.control.call("stop")
         if self.aprs_process:
-            self.aprs_process.terminate()
+            if not stopped:
+                self.aprs_process.terminate()
             try:
                 self.aprs_process.wait(timeout=5)
             except subprocess.TimeoutExpired:
                 self.aprs_process.kill()
         self.aprs_process = None
         if self.process_monitor:
+            self.flush_process_output()
             self.process_monitor.running = False
-        self.start_btn.setEnabled(True)
+            self.process_monitor = None
+        self.start_btn.setText("▶ Start")
         self.stop_btn.setEnabled(False)
+        self.pause_btn.setEnabled(False)
         self.status_label.setText("Status: Stopped")
         self.status_label.setStyleSheet("QLabel { background-color: #f44336; color: white; padding: 5px; border: 1px solid #ccc; }")
 
+    def toggle_selected_pause(self):
+        row = self.table.currentRow()
+        item = self.table.item(row, 0) if row >= 0 else None
+        if not item or not item.text():
+            self.show_error("Pause Error", "Select an object row first")
+            return
+        status = self.control.call("status")
+        if not status:
+            self.show_error("Pause Error", "Beacon is not answering on its control socket")
+            return
+        name = item.text()
+        cmd = "resume" if name in status.get("paused", []) else "pause"
+        response = self.control.call(cmd, name=name)
+        if response and not response.get("ok", True):
+            self.show_error("Pause Error", response.get("error", f"{cmd} failed"))
+        elif response:
+            self.log(f"{'▶' if cmd == 'resume' else '⏸'} {name} {cmd}d")
+
     def check_process_status(self):
         if self.aprs_process and self.aprs_process.poll() is not None:
             self.log(f"⚠ Beacon process terminated with code: {self.aprs_process.returncode}")
             self.stop_beaconing()
+            return
+        if not self.process_monitor:
+            return
+        status = self.control.call("status")
+        if status is None:
+            if not self.aprs_process:
+                self.log("⚠ Lost contact with the beacon")
+                self.stop_beaconing()
+            return
+        counters = self.control.call("counters") or {}
+        sent = sum(counters.get("sent", {}).values())
+        failed = sum(counters.get("failed", {}).values())
+        state = "connected" if status.get("connected") else "disconnected"
+        if status.get("dry_run"):
+            state = "dry run"
+        text = f"Status: Running ({state}) · {status.get('beacons', 0)} beacons · {int(sent)} sent"
+        if failed:
+            text += f" · {int(failed)} failed"
+        if status.get("paused"):
+            text += f" · paused: {', '.join(status['paused'])}"
+        self.status_label.setText(text)
 
     def closeEvent(self, event):
         if self.aprs_process: